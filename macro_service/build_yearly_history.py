@@ -14,6 +14,7 @@ Build a local SQLite store containing the past year's macro + sentiment frames.
 
 import json
 import sqlite3
+from bisect import bisect_right
 import time
 from datetime import datetime, timedelta, date
 from pathlib import Path
@@ -284,14 +285,18 @@ def _value_on_or_before(series: List[Tuple[date, Optional[float]]], target: date
     return value
 
 
+class _SortedMap(dict):
+    """构建后不再修改的 {date: value}，一次性缓存排序后的日期，供逐日回溯时二分查找"""
+
+    def __init__(self, data: Dict[date, float]):
+        super().__init__(data)
+        self.sorted_keys = sorted(self)
+
+
 def _value_from_map_on_or_before(series_map: Dict[date, float], target: date) -> Optional[float]:
-    value = None
-    for dt in sorted(series_map.keys()):
-        if dt <= target:
-            value = series_map[dt]
-        else:
-            break
-    return value
+    keys = series_map.sorted_keys if isinstance(series_map, _SortedMap) else sorted(series_map)
+    idx = bisect_right(keys, target) - 1
+    return series_map[keys[idx]] if idx >= 0 else None
 
 def _pct_change(series: List[Tuple[date, Optional[float]]], target: date, days: int) -> Optional[float]:
     current = _value_on_or_before(series, target)
@@ -319,7 +324,7 @@ def _build_payload(
     stable_hist: Dict[date, float],
     btc_mcap_hist: Dict[date, float],
     eth_mcap_hist: Dict[date, float],
-    total_mcap_hist: Dict[date, float],
+    total_mcap_hist: _SortedMap,
     funding_hist: Dict[date, float],
     fg_hist: Dict[date, int],
     alt_snapshot: Optional[Dict[str, float]],
@@ -396,7 +401,7 @@ def _build_payload(
     if total3_cap_b is not None:
         # 回溯 total3 series
         total3_series = []
-        for dt in sorted(total_mcap_hist.keys()):
+        for dt in total_mcap_hist.sorted_keys:
             if dt > date_cursor:
                 break
             tm = total_mcap_hist.get(dt)
@@ -412,7 +417,7 @@ def _build_payload(
     if btc_dominance is not None:
         # 构建 dominance 历史
         dom_hist = []
-        for dt in sorted(total_mcap_hist.keys()):
+        for dt in total_mcap_hist.sorted_keys:
             tm = total_mcap_hist.get(dt)
             bm = btc_mcap_hist.get(dt)
             if tm and bm:
@@ -476,12 +481,12 @@ def main():
     dxy = _fetch_yfinance(session, "DX-Y.NYB")
     btc = _fetch_yfinance(session, "BTC-USD")
     etf_hist = _fetch_farside_etf_history()
-    stable_hist = _fetch_stablecoin_history()
-    btc_mcap_hist = _fetch_cg_market_caps("bitcoin")
-    eth_mcap_hist = _fetch_cg_market_caps("ethereum")
-    total_mcap_hist = _fetch_cg_market_caps("global")  # 可能失败，失败则相关字段缺失
-    funding_hist = _fetch_binance_funding_history("BTCUSDT")
-    fg_hist = _fetch_fg_history()
+    stable_hist = _SortedMap(_fetch_stablecoin_history())
+    btc_mcap_hist = _SortedMap(_fetch_cg_market_caps("bitcoin"))
+    eth_mcap_hist = _SortedMap(_fetch_cg_market_caps("ethereum"))
+    total_mcap_hist = _SortedMap(_fetch_cg_market_caps("global"))  # 可能失败，失败则相关字段缺失
+    funding_hist = _SortedMap(_fetch_binance_funding_history("BTCUSDT"))
+    fg_hist = _SortedMap(_fetch_fg_history())
     # alternative.me 快照兜底（仅当前值）
     alt_snapshot = _fetch_alt_global()
     alt_btc = _fetch_alt_ticker("bitcoin")
@@ -492,6 +497,7 @@ def main():
     conn.execute("DELETE FROM daily_context WHERE date BETWEEN ? AND ?", ((end - timedelta(days=365)).isoformat(), end.isoformat()))
 
     target_start = end - timedelta(days=365)
+    now_iso = datetime.utcnow().isoformat()
     for current in all_dates:
         if current < target_start:
             continue
@@ -515,7 +521,7 @@ def main():
         )
         conn.execute(
             "INSERT OR REPLACE INTO daily_context (date, payload, created_at) VALUES (?, ?, ?)",
-            (current.isoformat(), json.dumps(payload, ensure_ascii=False), datetime.utcnow().isoformat())
+            (current.isoformat(), json.dumps(payload, ensure_ascii=False), now_iso)
         )
     conn.commit()
     conn.close()
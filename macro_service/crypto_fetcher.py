@@ -8,13 +8,110 @@ import pandas as pd
 import requests
 import time
 import json
+import functools
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
+
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import requests_cache
+    REQUESTS_CACHE_AVAILABLE = True
+except ImportError:
+    REQUESTS_CACHE_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Farside 会拦截默认的 python-requests UA
+HTTP_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+# 币安合约 IP 限频：1200 weight / 分钟
+BINANCE_WEIGHT_PER_MIN = 1200
+BINANCE_WEIGHT_BURST = 200
+# 不带 symbol 的 /fapi/v1/ticker/24hr 权重为 40
+BINANCE_TICKERS_WEIGHT = 40
+# 同一轮刷新内复用批量行情的时间窗口（秒）
+TICKER_CACHE_TTL = 5
+# ETH/BTC 比率所需的合约
+RATIO_SYMBOLS = ("ETH/USDT", "BTC/USDT")
+
+# 统计的主流稳定币
+STABLECOIN_WHITELIST = frozenset({"USDT", "USDC", "DAI", "FDUSD", "USDe"})
+
+# 日更/慢更数据源的本地 HTTP 缓存时间（秒），未列出的地址（币安等实时行情）不缓存
+HTTP_CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+HTTP_CACHE_TTL = {
+    "farside.co.uk": 6 * 3600,
+    "api.coingecko.com": 30 * 60,
+    "api.alternative.me": 6 * 3600,
+}
+
+# _fill_with_cache 中值为 0 也视为缺失的字段
+_FUTURES_ZERO_MISSING = frozenset({"price"})
+_STRUCTURE_ZERO_MISSING = frozenset({"eth_btc_ratio"})
+
+# Farside 数值单元格中需要去掉的千分位、货币符号与空白（单次 translate 完成）
+_FLOW_STRIP_TABLE = str.maketrans('', '', ',$ \t\n\xa0')
+
+
+def _loads(data: bytes) -> Any:
+    """直接从响应 bytes 解析 JSON，有 orjson 时跳过 bytes→str 的解码"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶限频器
+    只有在接近限额时才阻塞，替代 ccxt enableRateLimit 每次调用之间的固定 sleep
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, weight: float = 1) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                wait = (weight - self.tokens) / self.rate
+            logger.warning(f"⏳ 接近币安限频，等待 {wait:.2f}s")
+            time.sleep(wait)
+
+
+@functools.lru_cache(maxsize=64)
+def _normalize_symbol(symbol: str) -> tuple[str, str]:
+    """标准化 symbol，返回 (ccxt 格式 BTC/USDT, 币安原生格式 BTCUSDT)"""
+    if "/" not in symbol:
+        symbol = f"{symbol}/USDT"
+    return symbol, symbol.replace("/", "")
+
 
 class CryptoDataLoader:
     def __init__(self, api_key=None, secret=None):
@@ -22,11 +119,38 @@ class CryptoDataLoader:
         初始化币安合约接口
         即使不填 Key 也能获取行情数据，填了 Key 频次限制更宽松
         """
+        # 429 / 5xx 时按指数退避重试（遵循 Retry-After）
+        retry = Retry(
+            total=4,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+            raise_on_status=False,  # 重试用尽后返回最后一次响应，交给各调用点自行判断状态码
+        )
+        if REQUESTS_CACHE_AVAILABLE:
+            HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self.http = requests_cache.CachedSession(
+                str(HTTP_CACHE_DIR / "crypto"),
+                backend="sqlite",
+                urls_expire_after={**HTTP_CACHE_TTL, "*": requests_cache.DO_NOT_CACHE},
+            )
+        else:
+            self.http = requests.Session()
+        self.http.headers["User-Agent"] = HTTP_USER_AGENT
+        # 复用 keep-alive 连接，各 host 共享连接池
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        
         try:
             self.exchange = ccxt.binanceusdm({
                 'apiKey': api_key or '',
                 'secret': secret or '',
-                'enableRateLimit': True,
+                # 关闭 ccxt 内置的逐次 sleep，由 self._bucket 统一限频
+                'enableRateLimit': False,
+                # 复用 self.http：ccxt 请求同样走连接池与 429/5xx 退避重试（Binance URL 不缓存）
+                'session': self.http,
                 'options': {
                     'defaultType': 'future'  # 使用期货市场
                 }
@@ -35,31 +159,49 @@ class CryptoDataLoader:
         except Exception as e:
             logger.error(f"❌ 初始化 Binance 接口失败: {e}")
             self.exchange = None
-        
+
+        self._bucket = TokenBucket(rate=BINANCE_WEIGHT_PER_MIN / 60, burst=BINANCE_WEIGHT_BURST)
+
         self.cache_path = Path(__file__).resolve().parent / "data_cache.json"
         self.cache = self._load_cache()
+        # 三个 getter 会在不同线程中同时读写 self.cache，序列化与修改需互斥
+        self._cache_lock = threading.RLock()
+        # 批量行情短期缓存：{BTCUSDT: ticker}，期货与市场结构两个 getter 共用一次请求
+        self._tickers: Dict[str, Dict[str, Any]] = {}
+        self._tickers_at = 0.0
+        self._tickers_lock = threading.Lock()
+        self._markets_lock = threading.Lock()
 
     def _load_cache(self) -> Dict[str, Any]:
         if self.cache_path.exists():
             try:
+                if ORJSON_AVAILABLE:
+                    return orjson.loads(self.cache_path.read_bytes())
                 with open(self.cache_path, "r", encoding="utf-8") as f:
                     return json.load(f)
             except Exception as e:
                 logger.warning(f"⚠️ 读取缓存失败 ({self.cache_path}): {e}")
         return {"futures": {}, "etf": {}, "structure": {}}
 
-    def _write_cache(self) -> None:
+    def _write_cache_locked(self) -> None:
         try:
             self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            if ORJSON_AVAILABLE:
+                # orjson 直接输出 UTF-8 bytes，等价于 ensure_ascii=False
+                self.cache_path.write_bytes(
+                    orjson.dumps(self.cache, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                )
+                return
             with open(self.cache_path, "w", encoding="utf-8") as f:
                 json.dump(self.cache, f, ensure_ascii=False, indent=2)
         except Exception as e:
             logger.warning(f"⚠️ 写入缓存失败 ({self.cache_path}): {e}")
 
     def _update_cache_section(self, section: str, payload: Dict[str, Any]) -> None:
-        section_data = self.cache.setdefault(section, {})
-        section_data.update(payload)
-        self._write_cache()
+        with self._cache_lock:
+            section_data = self.cache.setdefault(section, {})
+            section_data.update(payload)
+            self._write_cache_locked()
 
     def _get_cache_section(self, section: str) -> Dict[str, Any]:
         return self.cache.get(section, {})
@@ -69,13 +211,14 @@ class CryptoDataLoader:
             return
         today = datetime.utcnow().strftime("%Y-%m-%d")
         history_key = f"{key}_history"
-        history = self.cache.setdefault(section, {}).setdefault(history_key, [])
-        if history and history[-1].get("date") == today:
-            history[-1]["value"] = value
-        else:
-            history.append({"date": today, "value": value})
-        self.cache[section][history_key] = history[-limit:]
-        self._write_cache()
+        with self._cache_lock:
+            history = self.cache.setdefault(section, {}).setdefault(history_key, [])
+            if history and history[-1].get("date") == today:
+                history[-1]["value"] = value
+            else:
+                history.append({"date": today, "value": value})
+            self.cache[section][history_key] = history[-limit:]
+            self._write_cache_locked()
 
     def _get_history(self, section: str, key: str) -> list:
         return self.cache.get(section, {}).get(f"{key}_history", [])
@@ -105,11 +248,10 @@ class CryptoDataLoader:
         window = history[-length:]
         return sum(window) / len(window)
 
-    def _fill_with_cache(self, section: str, data: Dict[str, Any], zeros_missing: Optional[set] = None) -> Dict[str, Any]:
-        zeros_missing = zeros_missing or set()
+    def _fill_with_cache(self, section: str, data: Dict[str, Any], zeros_missing: Optional[frozenset] = None) -> Dict[str, Any]:
         cache_section = self._get_cache_section(section)
         for key, value in data.items():
-            needs_fill = value is None or (key in zeros_missing and value == 0)
+            needs_fill = value is None or (zeros_missing is not None and key in zeros_missing and value == 0)
             if needs_fill:
                 cached_value = cache_section.get(key)
                 if cached_value is not None:
@@ -129,7 +271,7 @@ class CryptoDataLoader:
             return None
         if isinstance(raw, (int, float)):
             return float(raw)
-        text = str(raw).replace(',', '').strip()
+        text = str(raw).translate(_FLOW_STRIP_TABLE)
         multiplier = 1.0
         if text.endswith('M'):
             multiplier = 1.0
@@ -142,6 +284,100 @@ class CryptoDataLoader:
         except ValueError:
             return None
 
+    @staticmethod
+    def _parse_farside_rows(page: str) -> list:
+        """
+        直接用 lxml 解析 Farside 表格，返回 [{表头: 单元格文本}, ...]
+        只需最后几行的 Date/Total/IBIT，不必构造 DataFrame
+        """
+        doc = lxml_html.fromstring(page)
+        tables = doc.xpath('//table[contains(@class,"etf")]') or doc.xpath('//table')
+        if not tables:
+            return []
+
+        header = None
+        rows = []
+        for tr in tables[0].iter('tr'):
+            cells = [cell.text_content().strip() for cell in tr.xpath('./th|./td')]
+            if header is None:
+                # 表头可能有多行（基金名/代码/费率），以包含 Total 的那一行为准
+                if 'Total' in cells:
+                    header = cells
+                    if not header[0]:
+                        header[0] = 'Date'
+                continue
+            if any(cells):
+                rows.append(dict(zip(header, cells)))
+        return rows
+
+    def _ensure_markets(self) -> None:
+        """进程内只加载一次市场信息，避免多个线程首次调用时各自 load_markets"""
+        if self.exchange.markets:
+            return
+        with self._markets_lock:
+            if not self.exchange.markets:
+                self._bucket.acquire(1)
+                self.exchange.load_markets()
+
+    def _get_tickers(self, symbols) -> Dict[str, Dict[str, Any]]:
+        """
+        一次 fetch_tickers 批量获取多个合约行情，按币安原生 symbol (BTCUSDT) 索引
+        TICKER_CACHE_TTL 内重复调用且所需 symbol 都已在缓存中时直接复用
+        """
+        wanted = {_normalize_symbol(sym)[1]: _normalize_symbol(sym)[0] for sym in symbols}
+        self._ensure_markets()
+        with self._tickers_lock:
+            fresh = time.monotonic() - self._tickers_at < TICKER_CACHE_TTL
+            if fresh and all(raw in self._tickers for raw in wanted):
+                return self._tickers
+            self._bucket.acquire(BINANCE_TICKERS_WEIGHT)
+            tickers = self.exchange.fetch_tickers(list(wanted.values()))
+            self._tickers = {t['info']['symbol']: t for t in tickers.values()}
+            self._tickers_at = time.monotonic()
+            return self._tickers
+
+    def _fetch_funding_rate(self, symbol: str) -> Dict[str, Any]:
+        self._bucket.acquire(1)
+        return self.exchange.fetch_funding_rate(symbol)
+
+    def _fetch_open_interest(self, symbol: str) -> Dict[str, Any]:
+        self._bucket.acquire(1)
+        return self.exchange.fetch_open_interest(symbol)
+
+    def _fetch_ls_ratio(self, symbol_clean: str) -> Optional[float]:
+        """
+        全市场多空账户比
+        CCXT 统一方法拿不到这个 Global Ratio，走隐式接口 fapiData/globalLongShortAccountRatio，
+        与其他行情请求共用 exchange 的连接与限频；失败时返回 None，不影响其他字段
+        """
+        ls_params = {
+            "symbol": symbol_clean,
+            "period": "1d",  # 关注日线级别的多空倾向
+            "limit": 1
+        }
+        self._bucket.acquire(1)
+        try:
+            ls_data = self.exchange.fapiDataGetGlobalLongShortAccountRatio(ls_params)
+        except ccxt.BaseError as e:
+            logger.warning(f"获取多空比失败 ({symbol_clean}): {e}")
+            ls_data = []
+        return float(ls_data[0]['longShortRatio']) if ls_data else None
+
+    def _get_json(self, url: str, **kwargs) -> Any:
+        kwargs.setdefault("timeout", 10)
+        resp = self.http.get(url, **kwargs)
+        resp.raise_for_status()
+        return _loads(resp.content)
+
+    @staticmethod
+    def _iter_pegged_assets(resp) -> Iterator[Dict[str, Any]]:
+        """逐条产出 DeFi Llama 的 peggedAssets，有 ijson 时流式解析，避免整包 JSON 物化"""
+        if IJSON_AVAILABLE:
+            resp.raw.decode_content = True
+            yield from ijson.items(resp.raw, 'peggedAssets.item', use_float=True)
+        else:
+            yield from _loads(resp.content).get('peggedAssets', [])
+
     def get_binance_futures_data(self, symbol="BTC/USDT") -> Optional[Dict[str, Any]]:
         """
         获取第四层级：情绪与博弈数据
@@ -157,32 +393,24 @@ class CryptoDataLoader:
             
         try:
             # 标准化 symbol 格式
-            if "/" not in symbol:
-                symbol = f"{symbol}/USDT"
-            
-            # 1. 获取基础行情 (价格 & 24h变化)
-            ticker = self.exchange.fetch_ticker(symbol)
-            
-            # 2. 获取资金费率 (Funding Rate)
-            funding = self.exchange.fetch_funding_rate(symbol)
-            
-            # 3. 获取未平仓合约 (Open Interest)
-            oi = self.exchange.fetch_open_interest(symbol)
-            
-            # 4. 获取多空比 (Long/Short Ratio)
-            # CCXT 标准方法有时拿不到这个特定的 Global Ratio，直接调 API 更稳
-            # 这是一个公共端点，不需要签名
-            symbol_clean = symbol.replace("/", "")  # 转为 BTCUSDT
-            ls_url = "https://fapi.binance.com/fapi/data/globalLongShortAccountRatio"
-            ls_params = {
-                "symbol": symbol_clean,
-                "period": "1d",  # 关注日线级别的多空倾向
-                "limit": 1
-            }
+            symbol, symbol_clean = _normalize_symbol(symbol)
             
-            ls_resp = requests.get(ls_url, params=ls_params, timeout=10)
-            ls_data = ls_resp.json() if ls_resp.status_code == 200 else []
-            ls_ratio = float(ls_data[0]['longShortRatio']) if ls_data else None
+            self._ensure_markets()
+            # 四个请求互不依赖，并发发出
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                # 1. 获取基础行情 (价格 & 24h变化)，与 ETH/BTC 比率共用一次批量请求
+                f_tickers = pool.submit(self._get_tickers, (symbol, *RATIO_SYMBOLS))
+                # 2. 获取资金费率 (Funding Rate)
+                f_funding = pool.submit(self._fetch_funding_rate, symbol)
+                # 3. 获取未平仓合约 (Open Interest)
+                f_oi = pool.submit(self._fetch_open_interest, symbol)
+                # 4. 获取多空比 (Long/Short Ratio)
+                f_ls = pool.submit(self._fetch_ls_ratio, symbol_clean)
+
+                ticker = f_tickers.result()[symbol_clean]
+                funding = f_funding.result()
+                oi = f_oi.result()
+                ls_ratio = f_ls.result()
             
             result = {
                 "symbol": symbol,
@@ -197,7 +425,7 @@ class CryptoDataLoader:
             }
             if result.get("price") is not None:
                 self._append_history("futures", "price", result["price"])
-            result = self._fill_with_cache("futures", result, zeros_missing={"price"})
+            result = self._fill_with_cache("futures", result, zeros_missing=_FUTURES_ZERO_MISSING)
             self._update_cache_section("futures", {
                 "price": result.get("price"),
                 "price_change_24h_pct": result.get("price_change_24h_pct"),
@@ -225,20 +453,18 @@ class CryptoDataLoader:
         Pentosh1 逻辑：净流入 > $200M = 强趋势信号
         """
         url = "https://farside.co.uk/btc/"
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
         
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.http.get(url, timeout=10)
             response.raise_for_status()
 
-            tables = pd.read_html(response.text)
-            if not tables:
+            rows = self._parse_farside_rows(response.text)
+            if not rows:
                 return {"etf_net_inflow_total": 0, "status": "No table found", "timestamp": datetime.now().isoformat()}
 
-            df = tables[0]
-            latest = df.iloc[-1]
-            if pd.isna(latest.get('Total', None)) and len(df) > 1:
-                latest = df.iloc[-2]
+            latest = rows[-1]
+            if not latest.get('Total') and len(rows) > 1:
+                latest = rows[-2]
 
             total_value = self._parse_flow_value(latest.get('Total', 0))
             ibit_value = self._parse_flow_value(latest.get('IBIT', 0))
@@ -255,7 +481,7 @@ class CryptoDataLoader:
                 status = "weekend_forward_fill"
 
             week_values = []
-            for _, row in df.tail(7).iterrows():
+            for row in rows[-7:]:
                 value = self._parse_flow_value(row.get('Total'))
                 if value is not None:
                     week_values.append(value)
@@ -307,42 +533,42 @@ class CryptoDataLoader:
                 "timestamp": datetime.now().isoformat()
             }
 
-    def get_market_structure_and_liquidity(self) -> Dict[str, Any]:
-        """
-        获取第二层级(稳定币) & 第三层级(BTC.D, TOTAL3) & 第四层级(恐慌指数)
-        """
-        metrics = {}
-        
-        # 1. 稳定币总市值 (DeFi Llama)
+    def _fetch_stables(self) -> Dict[str, Any]:
+        """稳定币总市值 (DeFi Llama)"""
         try:
-            stable_url = "https://stablecoins.llama.fi/stablecoins?includePrices=true"
-            resp = requests.get(stable_url, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            total_stable_cap = 0
-            for coin in data.get('peggedAssets', []):
-                # 统计主流稳定币
-                if coin.get('symbol') in ['USDT', 'USDC', 'DAI', 'FDUSD', 'USDe']:
+            # 只用 circulating.peggedUSD，不需要 includePrices 附带的价格字段
+            stable_url = "https://stablecoins.llama.fi/stablecoins"
+            # 同一代码可能被小币复用，且 peggedAssets 不保证按市值排序：每个代码只取市值最大的一条
+            cap_by_symbol: Dict[str, float] = {}
+            with self.http.get(stable_url, stream=True, timeout=10) as resp:
+                resp.raise_for_status()
+                for coin in self._iter_pegged_assets(resp):
+                    # 统计主流稳定币
+                    coin_symbol = coin.get('symbol')
+                    if coin_symbol not in STABLECOIN_WHITELIST:
+                        continue
                     circulating = coin.get('circulating', {})
                     if isinstance(circulating, dict):
-                        total_stable_cap += (circulating.get('peggedUSD') or 0)
+                        cap = circulating.get('peggedUSD') or 0
                     elif isinstance(circulating, (int, float)):
-                        total_stable_cap += circulating
+                        cap = circulating
+                    else:
+                        cap = 0
+                    if cap > cap_by_symbol.get(coin_symbol, 0):
+                        cap_by_symbol[coin_symbol] = cap
+            total_stable_cap = sum(cap_by_symbol.values())
             
-            metrics['stablecoin_total_cap_billions'] = round(total_stable_cap / 1e9, 2)
+            return {'stablecoin_total_cap_billions': round(total_stable_cap / 1e9, 2)}
         except Exception as e:
             logger.warning(f"获取稳定币数据失败: {e}")
-            metrics['stablecoin_total_cap_billions'] = 0
-        self._append_history("structure", "stablecoin_cap", metrics['stablecoin_total_cap_billions'])
-        
-        # 2. 市场结构: BTC.D 和 TOTAL3 (CoinGecko)
+            return {'stablecoin_total_cap_billions': 0}
+
+    def _fetch_cg_global(self) -> Dict[str, Any]:
+        """市场结构: BTC.D 和 TOTAL3 (CoinGecko)"""
         try:
             # CoinGecko 免费版无需 Key，限制约 10-30次/分钟
             cg_url = "https://api.coingecko.com/api/v3/global"
-            cg_resp = requests.get(cg_url, timeout=10)
-            cg_resp.raise_for_status()
-            cg_data = cg_resp.json()['data']
+            cg_data = self._get_json(cg_url)['data']
             
             btc_d = cg_data['market_cap_percentage']['btc']
             eth_d = cg_data['market_cap_percentage']['eth']
@@ -352,57 +578,94 @@ class CryptoDataLoader:
             # 这是一个近似值，非常接近 TradingView 的 TOTAL3
             total3_val = total_cap * (1 - (btc_d/100) - (eth_d/100))
             
-            metrics['btc_dominance'] = round(btc_d, 2)
-            metrics['eth_dominance'] = round(eth_d, 2)
-            metrics['total3_cap_billions'] = round(total3_val / 1e9, 2)
-            metrics['total_market_cap_billions'] = round(total_cap / 1e9, 2)
+            return {
+                'btc_dominance': round(btc_d, 2),
+                'eth_dominance': round(eth_d, 2),
+                'total3_cap_billions': round(total3_val / 1e9, 2),
+                'total_market_cap_billions': round(total_cap / 1e9, 2)
+            }
         except Exception as e:
             logger.warning(f"获取 CoinGecko 数据失败: {e}")
-            metrics['btc_dominance'] = 55.0  # Fallback
-            metrics['total3_cap_billions'] = 0
-        self._append_history("structure", "btc_dom", metrics['btc_dominance'])
-        self._append_history("structure", "total3", metrics['total3_cap_billions'])
-        
-        # 3. ETH/BTC Ratio (使用 Binance 价格计算)
+            return {
+                'btc_dominance': 55.0,  # Fallback
+                'total3_cap_billions': 0
+            }
+
+    def _fetch_prices(self) -> Dict[str, Any]:
+        """ETH/BTC Ratio (使用 Binance 价格计算)"""
+        eth_btc_ratio = None
+        eth_symbol = _normalize_symbol("ETH/USDT")[1]
+        btc_symbol = _normalize_symbol("BTC/USDT")[1]
         try:
-            if self.exchange:
-                eth_ticker = self.exchange.fetch_ticker("ETH/USDT")
-                btc_ticker = self.exchange.fetch_ticker("BTC/USDT")
-                eth_btc_ratio = eth_ticker['last'] / btc_ticker['last'] if btc_ticker['last'] > 0 else 0
-                metrics['eth_btc_ratio'] = round(eth_btc_ratio, 6)
-            else:
+            if not self.exchange:
+                raise RuntimeError("Binance 交易所未初始化")
+            tickers = self._get_tickers(RATIO_SYMBOLS)
+            eth_last = tickers[eth_symbol]['last']
+            btc_last = tickers[btc_symbol]['last']
+            if btc_last:
+                eth_btc_ratio = eth_last / btc_last
+        except Exception as e:
+            logger.warning(f"Binance 价格获取失败，改用 CoinGecko: {e}")
+
+        if eth_btc_ratio is None:
+            try:
                 # 备用方案：使用 CoinGecko
                 eth_url = "https://api.coingecko.com/api/v3/simple/price?ids=ethereum,bitcoin&vs_currencies=usd"
-                eth_resp = requests.get(eth_url, timeout=10)
-                if eth_resp.status_code == 200:
-                    prices = eth_resp.json()
-                    eth_price = prices.get('ethereum', {}).get('usd', 0)
-                    btc_price = prices.get('bitcoin', {}).get('usd', 0)
-                    if btc_price > 0:
-                        metrics['eth_btc_ratio'] = round(eth_price / btc_price, 6)
-                    else:
-                        metrics['eth_btc_ratio'] = 0
-                else:
-                    metrics['eth_btc_ratio'] = 0
-        except Exception as e:
-            logger.warning(f"计算 ETH/BTC 比率失败: {e}")
-            metrics['eth_btc_ratio'] = 0
-        
-        # 填补 Eth/BTC 等无法为 0 的字段
-        metrics = self._fill_with_cache("structure", metrics, zeros_missing={"eth_btc_ratio"})
+                prices = self._get_json(eth_url)
+                eth_price = prices.get('ethereum', {}).get('usd', 0)
+                btc_price = prices.get('bitcoin', {}).get('usd', 0)
+                if btc_price > 0:
+                    eth_btc_ratio = eth_price / btc_price
+            except Exception as e:
+                logger.warning(f"计算 ETH/BTC 比率失败: {e}")
+        return {'eth_btc_ratio': round(eth_btc_ratio, 6) if eth_btc_ratio is not None else 0}
 
-        # 4. 恐惧贪婪指数 (Alternative.me)
+    def _fetch_fng(self) -> Dict[str, Any]:
+        """恐惧贪婪指数 (Alternative.me)"""
         try:
             fg_url = "https://api.alternative.me/fng/?limit=1"
-            fg_resp = requests.get(fg_url, timeout=10)
-            fg_resp.raise_for_status()
-            fg_data = fg_resp.json()
-            metrics['fear_greed_index'] = int(fg_data['data'][0]['value'])
-            metrics['fear_greed_classification'] = fg_data['data'][0].get('value_classification', 'Neutral')
+            fg_data = self._get_json(fg_url)
+            return {
+                'fear_greed_index': int(fg_data['data'][0]['value']),
+                'fear_greed_classification': fg_data['data'][0].get('value_classification', 'Neutral')
+            }
         except Exception as e:
             logger.warning(f"获取恐惧贪婪指数失败: {e}")
-            metrics['fear_greed_index'] = 50
-            metrics['fear_greed_classification'] = 'Neutral'
+            return {
+                'fear_greed_index': 50,
+                'fear_greed_classification': 'Neutral'
+            }
+
+    def get_market_structure_and_liquidity(self) -> Dict[str, Any]:
+        """
+        获取第二层级(稳定币) & 第三层级(BTC.D, TOTAL3) & 第四层级(恐慌指数)
+        四个数据源互不依赖，并发请求；各自的异常在 _fetch_* 内部处理
+        """
+        metrics = {}
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            f_stable = pool.submit(self._fetch_stables)
+            f_cg = pool.submit(self._fetch_cg_global)
+            f_prices = pool.submit(self._fetch_prices)
+            f_fng = pool.submit(self._fetch_fng)
+
+            # 1. 稳定币总市值 (DeFi Llama)
+            metrics.update(f_stable.result())
+            # 2. 市场结构: BTC.D 和 TOTAL3 (CoinGecko)
+            metrics.update(f_cg.result())
+            # 3. ETH/BTC Ratio (Binance)
+            metrics.update(f_prices.result())
+            # 4. 恐惧贪婪指数 (Alternative.me)
+            fng = f_fng.result()
+
+        self._append_history("structure", "stablecoin_cap", metrics['stablecoin_total_cap_billions'])
+        self._append_history("structure", "btc_dom", metrics['btc_dominance'])
+        self._append_history("structure", "total3", metrics['total3_cap_billions'])
+
+        # 填补 Eth/BTC 等无法为 0 的字段
+        metrics = self._fill_with_cache("structure", metrics, zeros_missing=_STRUCTURE_ZERO_MISSING)
+
+        metrics.update(fng)
         metrics['btc_dom_trend_90d'] = self._compute_pct_change("structure", "btc_dom", 90, metrics.get('btc_dominance'))
         metrics['stablecoin_growth_30d_pct'] = self._compute_pct_change("structure", "stablecoin_cap", 30, metrics.get('stablecoin_total_cap_billions'))
         ma50 = self._compute_ma("structure", "total3", 50)
@@ -430,10 +693,14 @@ class CryptoDataLoader:
         """
         logger.info(f"📡 开始获取 {symbol} 的完整币圈数据...")
         
-        # 获取各层级数据
-        binance_data = self.get_binance_futures_data(symbol)
-        etf_data = self.get_etf_flows()
-        structure_data = self.get_market_structure_and_liquidity()
+        # 获取各层级数据：三者互不依赖且都是网络 I/O，并发执行
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            f_binance = pool.submit(self.get_binance_futures_data, symbol)
+            f_etf = pool.submit(self.get_etf_flows)
+            f_structure = pool.submit(self.get_market_structure_and_liquidity)
+            binance_data = f_binance.result()
+            etf_data = f_etf.result()
+            structure_data = f_structure.result()
         
         # 整合数据
         price_change_7d = self._compute_pct_change(
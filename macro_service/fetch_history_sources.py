@@ -12,12 +12,23 @@
 
 import json
 import sqlite3
-import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, date
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Callable, Optional
+from typing import List, Dict, Any, Tuple, Optional
 
+import numpy as np
+import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 BASE_FRED = "https://api.stlouisfed.org/fred/series/observations"
 FRED_API_KEY = None  # 可选：填入 FRED API KEY，提高稳定性
@@ -25,12 +36,46 @@ HISTORY_DB = Path(__file__).resolve().parent / "history" / "history.sqlite3"
 NEWS_DB = Path(__file__).resolve().parent.parent / "filter" / "pentosh1.db"
 
 
+def _get_json(url: str, **kwargs) -> Any:
+    """GET 并直接从响应 bytes 解析 JSON（有 orjson 时跳过 bytes→str 解码）。"""
+    resp = SESSION.get(url, **kwargs)
+    resp.raise_for_status()
+    if ORJSON_AVAILABLE:
+        return orjson.loads(resp.content)
+    return json.loads(resp.content)
+
+
+def _dumps(obj: Any) -> str:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _build_session() -> requests.Session:
+    """共享 Session：keep-alive 连接池 + 429/5xx 重试。"""
+    session = requests.Session()
+    session.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    # 429/5xx 指数退避重试，遵循 Retry-After，避免一次限流就让整轮历史拉取失败
+    retry = Retry(
+        total=4,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+SESSION = _build_session()
+
+
 def fetch_stablecoins_history() -> List[Dict[str, Any]]:
     """拉取 DeFi Llama 稳定币历史全量，再截取近一年。"""
     url = "https://stablecoins.llama.fi/stablecoincharts/all"
-    resp = requests.get(url, timeout=20)
-    resp.raise_for_status()
-    data = resp.json()
+    data = _get_json(url, timeout=20)
     one_year_ago = datetime.utcnow().date() - timedelta(days=365)
     filtered = []
     for point in data:
@@ -47,18 +92,18 @@ def fetch_stablecoins_history() -> List[Dict[str, Any]]:
     return filtered
 
 
-def fetch_binance_funding(symbol: str = "BTCUSDT", days: int = 365) -> List[Dict[str, Any]]:
-    """分页拉取币安合约资金费率历史，取每天最后一条记录。"""
+FUNDING_PAGE_LIMIT = 1000
+FUNDING_INTERVAL_MS = 8 * 3600 * 1000  # 资金费率默认 8 小时结算一次
+
+
+def _fetch_funding_window(symbol: str, start_ts: int, end_ts: int) -> List[Dict[str, Any]]:
+    """拉取 [start_ts, end_ts) 区间内的资金费率；区间按 1000 条划分，通常一页即可，结算更频繁时继续翻页。"""
     url = "https://fapi.binance.com/fapi/v1/fundingRate"
-    start_ts = int((datetime.utcnow() - timedelta(days=days)).timestamp() * 1000)
-    end_ts = int(datetime.utcnow().timestamp() * 1000)
     results = []
     cursor = start_ts
     while cursor < end_ts:
-        params = {"symbol": symbol, "startTime": cursor, "endTime": end_ts, "limit": 1000}
-        resp = requests.get(url, params=params, timeout=15)
-        resp.raise_for_status()
-        arr = resp.json()
+        params = {"symbol": symbol, "startTime": cursor, "endTime": end_ts - 1, "limit": FUNDING_PAGE_LIMIT}
+        arr = _get_json(url, params=params, timeout=15)
         if not arr:
             break
         for item in arr:
@@ -71,8 +116,23 @@ def fetch_binance_funding(symbol: str = "BTCUSDT", days: int = 365) -> List[Dict
                     "funding_rate": float(item["fundingRate"]),
                 }
             )
+        if len(arr) < FUNDING_PAGE_LIMIT:
+            break
         cursor = int(arr[-1]["fundingTime"]) + 1
-        time.sleep(0.35)  # 简单限速
+    return results
+
+
+def fetch_binance_funding(symbol: str = "BTCUSDT", days: int = 365) -> List[Dict[str, Any]]:
+    """按时间窗口并发拉取币安合约资金费率历史，取每天最后一条记录。"""
+    start_ts = int((datetime.utcnow() - timedelta(days=days)).timestamp() * 1000)
+    end_ts = int(datetime.utcnow().timestamp() * 1000) + 1
+    # 每个窗口恰好容纳一页（1000 条 × 8h），窗口之间互不依赖
+    span = FUNDING_PAGE_LIMIT * FUNDING_INTERVAL_MS
+    windows = [(ts, min(ts + span, end_ts)) for ts in range(start_ts, end_ts, span)]
+    # 并发数受限，429 由 SESSION 的重试策略按 Retry-After 退避
+    with ThreadPoolExecutor(max_workers=min(6, len(windows))) as pool:
+        chunks = pool.map(lambda w: _fetch_funding_window(symbol, *w), windows)
+        results = [r for chunk in chunks for r in chunk]
     # 取每日最后一条
     daily = {}
     for r in results:
@@ -80,8 +140,10 @@ def fetch_binance_funding(symbol: str = "BTCUSDT", days: int = 365) -> List[Dict
     return list(daily.values())
 
 
-def fetch_fred_series(series_id: str, start: str, end: str) -> List[Dict[str, Any]]:
-    """获取 FRED 序列；返回 date-value 列表。"""
+FRED_REFETCH_OVERLAP_DAYS = 14  # FRED 会修订近期观测值，增量拉取时回看一段
+
+
+def _fetch_fred_observations(series_id: str, start: str, end: str) -> List[Tuple[str, float]]:
     params = {
         "series_id": series_id,
         "file_type": "json",
@@ -90,9 +152,7 @@ def fetch_fred_series(series_id: str, start: str, end: str) -> List[Dict[str, An
     }
     if FRED_API_KEY:
         params["api_key"] = FRED_API_KEY
-    resp = requests.get(BASE_FRED, params=params, timeout=20)
-    resp.raise_for_status()
-    body = resp.json()
+    body = _get_json(BASE_FRED, params=params, timeout=20)
     out = []
     for obs in body.get("observations", []):
         date_txt = obs.get("date")
@@ -100,19 +160,44 @@ def fetch_fred_series(series_id: str, start: str, end: str) -> List[Dict[str, An
         if val_txt in (None, ".", ""):
             continue
         try:
-            out.append({"date": date_txt, "value": float(val_txt)})
+            out.append((date_txt, float(val_txt)))
         except Exception:
             continue
     return out
 
 
+def fetch_fred_series(series_id: str, start: str, end: str) -> List[Dict[str, Any]]:
+    """获取 FRED 序列；返回 date-value 列表。已缓存在 fred_observations 的区间只增量拉取末尾部分。"""
+    conn = _ensure_db()
+    try:
+        first_cached, last_cached = conn.execute(
+            "SELECT MIN(date), MAX(date) FROM fred_observations WHERE series_id = ?", (series_id,)
+        ).fetchone()
+        fetch_start = start
+        if first_cached is not None and first_cached <= start:
+            overlap_start = date.fromisoformat(last_cached) - timedelta(days=FRED_REFETCH_OVERLAP_DAYS)
+            fetch_start = max(start, overlap_start.isoformat())
+
+        fetched = _fetch_fred_observations(series_id, fetch_start, end)
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO fred_observations (series_id, date, value) VALUES (?, ?, ?)",
+                [(series_id, d, v) for d, v in fetched],
+            )
+        rows = conn.execute(
+            "SELECT date, value FROM fred_observations WHERE series_id = ? AND date BETWEEN ? AND ? ORDER BY date",
+            (series_id, start, end),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [{"date": d, "value": v} for d, v in rows]
+
+
 def fetch_fg_history(limit: int = 500) -> List[Dict[str, Any]]:
     """恐慌贪婪指数历史（alternative.me）。"""
     url = f"https://api.alternative.me/fng/?limit={limit}"
     try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        data = resp.json().get("data", [])
+        data = _get_json(url, timeout=15).get("data", [])
         rows = []
         for item in data:
             ts = item.get("timestamp")
@@ -129,52 +214,49 @@ def fetch_fg_history(limit: int = 500) -> List[Dict[str, Any]]:
         return []
 
 
-def _list_to_map(
-    rows: List[Dict[str, Any]],
-    value_key: str,
-    transform: Optional[Callable[[Any], Optional[float]]] = None,
-) -> Dict[date, float]:
-    """将 [{date, value_key}] 转为 {date_obj: value}，可选转换。"""
-    out: Dict[date, float] = {}
-    for row in rows:
-        d_txt = row.get("date")
-        val = row.get(value_key)
-        if d_txt is None or val is None:
-            continue
-        try:
-            dt = datetime.fromisoformat(str(d_txt)).date()
-        except Exception:
-            continue
-        try:
-            parsed_val = transform(val) if transform else float(val)
-        except Exception:
-            continue
-        out[dt] = parsed_val
-    return out
+def _to_series(rows: List[Dict[str, Any]], value_key: str, scale: float = 1.0) -> pd.Series:
+    """将 [{date, value_key}] 转为按日期升序的 Series，可选缩放；无法解析的日期/数值直接丢弃。"""
+    if not rows:
+        return pd.Series(dtype="float64")
+    df = pd.DataFrame(rows, columns=["date", value_key])
+    dates = pd.to_datetime(df["date"], errors="coerce").dt.normalize()
+    values = pd.to_numeric(df[value_key], errors="coerce") * scale
+    series = pd.Series(values.to_numpy(dtype="float64"), index=dates.to_numpy())
+    series = series[series.index.notna() & series.notna()]
+    # 同一天多条时保留最后一条
+    return series[~series.index.duplicated(keep="last")].sort_index()
 
 
-def _value_on_or_before(series_map: Dict[date, float], target: date) -> Optional[float]:
-    """按日期回溯取最近值。"""
-    value = None
-    for dt in sorted(series_map.keys()):
-        if dt <= target:
-            value = series_map[dt]
-        else:
-            break
-    return value
+@dataclass
+class _SortedSeries:
+    """按日期排序的序列，一次构建后用二分查找按日期回溯取值。"""
+
+    dates: np.ndarray  # datetime64[D]，升序
+    values: np.ndarray  # float64；不降为 float32，资产负债表数值在百万量级会丢精度
 
+    @classmethod
+    def from_series(cls, series: pd.Series) -> "_SortedSeries":
+        return cls(series.index.to_numpy().astype("datetime64[D]"), series.to_numpy(dtype=np.float64))
 
-def _pct_change(series_map: Dict[date, float], target: date, days: int) -> Optional[float]:
-    current = _value_on_or_before(series_map, target)
-    past = _value_on_or_before(series_map, target - timedelta(days=days))
-    if current is None or past in (None, 0):
-        return None
-    return round((current - past) / past * 100, 2)
+    def value_on_or_before(self, target: date) -> Optional[float]:
+        """按日期回溯取最近值。"""
+        idx = int(np.searchsorted(self.dates, np.datetime64(target, "D"), side="right")) - 1
+        return float(self.values[idx]) if idx >= 0 else None
+
+    def pct_change(self, target: date, days: int) -> Optional[float]:
+        current = self.value_on_or_before(target)
+        past = self.value_on_or_before(target - timedelta(days=days))
+        if current is None or past in (None, 0):
+            return None
+        return round((current - past) / past * 100, 2)
 
 
 def _ensure_db() -> sqlite3.Connection:
     HISTORY_DB.parent.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(str(HISTORY_DB))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS daily_context (
@@ -184,6 +266,16 @@ def _ensure_db() -> sqlite3.Connection:
         )
         """
     )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fred_observations (
+            series_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (series_id, date)
+        )
+        """
+    )
     return conn
 
 
@@ -217,62 +309,59 @@ def _load_history_map() -> Dict[date, str]:
 
 def _build_payload(
     date_cursor: date,
-    walcl_map: Dict[date, float],
-    tga_map: Dict[date, float],
-    rrp_map: Dict[date, float],
-    stable_map: Dict[date, float],
-    funding_map: Dict[date, float],
-    fg_map: Dict[date, float],
+    walcl: _SortedSeries,
+    tga: _SortedSeries,
+    rrp: _SortedSeries,
+    stable: _SortedSeries,
+    funding: _SortedSeries,
+    fg: _SortedSeries,
 ) -> Dict[str, Any]:
-    walcl_val = _value_on_or_before(walcl_map, date_cursor)
-    tga_val = _value_on_or_before(tga_map, date_cursor)
-    rrp_val = _value_on_or_before(rrp_map, date_cursor)
-
-    liquidity_today = None
-    liquidity_prev = None
+    walcl_val = walcl.value_on_or_before(date_cursor)
+    tga_val = tga.value_on_or_before(date_cursor)
+    rrp_val = rrp.value_on_or_before(date_cursor)
+
+    # 各层只写入非空字段，不再事后重建字典清理
+    layer1: Dict[str, Any] = {}
+    if walcl_val is not None:
+        layer1["walcl"] = walcl_val
+    if tga_val is not None:
+        layer1["tga"] = tga_val
+    if rrp_val is not None:
+        layer1["rrp"] = rrp_val
     if walcl_val is not None and tga_val is not None and rrp_val is not None:
         liquidity_today = walcl_val - tga_val - (rrp_val * 1000)
+        layer1["liquidity_billions"] = round(liquidity_today / 1000, 2)
         prev_date = date_cursor - timedelta(days=30)
-        walcl_prev = _value_on_or_before(walcl_map, prev_date)
-        tga_prev = _value_on_or_before(tga_map, prev_date)
-        rrp_prev = _value_on_or_before(rrp_map, prev_date)
+        walcl_prev = walcl.value_on_or_before(prev_date)
+        tga_prev = tga.value_on_or_before(prev_date)
+        rrp_prev = rrp.value_on_or_before(prev_date)
         if walcl_prev is not None and tga_prev is not None and rrp_prev is not None:
             liquidity_prev = walcl_prev - tga_prev - (rrp_prev * 1000)
-
-    stable_today = _value_on_or_before(stable_map, date_cursor)
-    stable_growth_30d = _pct_change(stable_map, date_cursor, 30)
-
-    funding_annualized = _value_on_or_before(funding_map, date_cursor)
-    fg_index = _value_on_or_before(fg_map, date_cursor)
-
-    payload = {
+            layer1["liquidity_change_30d_b"] = round((liquidity_today - liquidity_prev) / 1000, 2)
+
+    layer2: Dict[str, Any] = {}
+    stable_today = stable.value_on_or_before(date_cursor)
+    if stable_today is not None:
+        layer2["stablecoin_mcap_b"] = stable_today
+    stable_growth_30d = stable.pct_change(date_cursor, 30)
+    if stable_growth_30d is not None:
+        layer2["stablecoin_growth_30d_pct"] = stable_growth_30d
+
+    layer4: Dict[str, Any] = {}
+    funding_annualized = funding.value_on_or_before(date_cursor)
+    if funding_annualized is not None:
+        layer4["funding_rate_annualized_pct"] = funding_annualized
+    fg_index = fg.value_on_or_before(date_cursor)
+    if fg_index is not None:
+        layer4["fear_greed_index"] = fg_index
+
+    return {
         "date": date_cursor.isoformat(),
-        "layer1": {
-            "walcl": walcl_val,
-            "tga": tga_val,
-            "rrp": rrp_val,
-            "liquidity_billions": round(liquidity_today / 1000, 2) if liquidity_today is not None else None,
-            "liquidity_change_30d_b": round((liquidity_today - liquidity_prev) / 1000, 2)
-            if liquidity_today is not None and liquidity_prev is not None
-            else None,
-        },
-        "layer2": {
-            "stablecoin_mcap_b": stable_today,
-            "stablecoin_growth_30d_pct": stable_growth_30d
-        },
-        "layer4": {
-            "funding_rate_annualized_pct": funding_annualized,
-            "fear_greed_index": fg_index,
-        },
+        "layer1": layer1,
+        "layer2": layer2,
+        "layer4": layer4,
     }
 
-    # 清理空字段
-    payload["layer1"] = {k: v for k, v in payload["layer1"].items() if v is not None}
-    for layer in ("layer2", "layer3", "layer4"):
-        payload[layer] = {k: v for k, v in payload[layer].items() if v is not None}
-
-    return payload
-
 
 def _summary(name: str, rows: List[Dict[str, Any]]):
     if not rows:
@@ -323,61 +412,64 @@ def main():
     start = start_date.isoformat()
     end = end_date.isoformat()
 
-    # 1) 稳定币历史
-    stable = fetch_stablecoins_history()
+    # 各数据源互不依赖，并发拉取
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = {
+            # 1) 稳定币历史
+            "stable": pool.submit(fetch_stablecoins_history),
+            # 2) 币安资金费率 / 恐慌贪婪
+            "funding": pool.submit(fetch_binance_funding, symbol="BTCUSDT", days=365),
+            "fg": pool.submit(fetch_fg_history, limit=500),
+            # 3) FRED 序列
+            "walcl": pool.submit(fetch_fred_series, "WALCL", start, end),
+            "tga": pool.submit(fetch_fred_series, "WTREGEN", start, end),
+            "rrp": pool.submit(fetch_fred_series, "RRPONTSYD", start, end),
+        }
+        results = {name: fut.result() for name, fut in futures.items()}
+
+    stable = results["stable"]
+    funding = results["funding"]
+    fg_rows = results["fg"]
+    walcl_rows = results["walcl"]
+    tga_rows = results["tga"]
+    rrp_rows = results["rrp"]
     _summary("stablecoins_llama", stable)
-
-    # 2) 币安资金费率
-    funding = fetch_binance_funding(symbol="BTCUSDT", days=365)
     _summary("binance_funding_BTCUSDT", funding)
-    fg_rows = fetch_fg_history(limit=500)
     _summary("fear_greed", fg_rows)
-
-    # 3) FRED 序列
-    walcl_rows = fetch_fred_series("WALCL", start, end)
-    tga_rows = fetch_fred_series("WTREGEN", start, end)
-    rrp_rows = fetch_fred_series("RRPONTSYD", start, end)
     _summary("fred_WALCL", walcl_rows)
     _summary("fred_WTREGEN", tga_rows)
     _summary("fred_RRPONTSYD", rrp_rows)
 
     # --- 将数据写入 history.sqlite3 ---
-    walcl_map = _list_to_map(walcl_rows, "value")
-    tga_map = _list_to_map(tga_rows, "value")
-    rrp_map = _list_to_map(rrp_rows, "value")
-    stable_map = _list_to_map(stable, "stablecoin_usd", lambda v: float(v) / 1e9)  # 转为 Billions
-    funding_map = _list_to_map(
-        funding, "funding_rate", lambda v: float(v) * 3 * 365 * 100  # 8 小时一次，年化百分比
-    )
-    fg_map = _list_to_map(fg_rows, "fg_index")
-
-    all_dates = sorted(
-        {
-            *walcl_map.keys(),
-            *tga_map.keys(),
-            *rrp_map.keys(),
-            *stable_map.keys(),
-            *funding_map.keys(),
-            *fg_map.keys(),
-        }
-    )
-    conn = _ensure_db()
-    conn.execute("DELETE FROM daily_context WHERE date BETWEEN ? AND ?", (start_date.isoformat(), end_date.isoformat()))
+    series = [
+        _SortedSeries.from_series(_to_series(rows, key, scale))
+        for rows, key, scale in (
+            (walcl_rows, "value", 1.0),
+            (tga_rows, "value", 1.0),
+            (rrp_rows, "value", 1.0),
+            (stable, "stablecoin_usd", 1e-9),  # 转为 Billions
+            (funding, "funding_rate", 3 * 365 * 100),  # 8 小时一次，年化百分比
+            (fg_rows, "fg_index", 1.0),
+        )
+    ]
+    all_dates = np.unique(np.concatenate([ser.dates for ser in series])).astype(date)
 
-    inserted = 0
-    for current in all_dates:
-        if current < start_date or current > end_date:
-            continue
-        payload = _build_payload(current, walcl_map, tga_map, rrp_map, stable_map, funding_map, fg_map)
-        conn.execute(
+    now_iso = datetime.utcnow().isoformat()
+    rows = [
+        (current.isoformat(), _dumps(_build_payload(current, *series)), now_iso)
+        for current in all_dates
+        if start_date <= current <= end_date
+    ]
+
+    conn = _ensure_db()
+    with conn:
+        conn.execute("DELETE FROM daily_context WHERE date BETWEEN ? AND ?", (start_date.isoformat(), end_date.isoformat()))
+        conn.executemany(
             "INSERT OR REPLACE INTO daily_context (date, payload, created_at) VALUES (?, ?, ?)",
-            (current.isoformat(), json.dumps(payload, ensure_ascii=False), datetime.utcnow().isoformat()),
+            rows,
         )
-        inserted += 1
-
-    conn.commit()
     conn.close()
-    print(f"[history.sqlite3] 已写入 {inserted} 条记录 -> {HISTORY_DB}")
+    print(f"[history.sqlite3] 已写入 {len(rows)} 条记录 -> {HISTORY_DB}")
     # 回填 pentosh1.db
     backfill_news()
 
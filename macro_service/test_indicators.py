@@ -2,9 +2,15 @@
 测试脚本：检查所有Pentosh1宏观指标的数据可用性
 测试日期：2025-01-06
 """
+import json
 import os
+import pickle
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from importlib.util import find_spec
+from pathlib import Path
 
 # 尝试导入库
 # 设置编码
@@ -13,18 +19,9 @@ if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-try:
-    from fredapi import Fred
-    FRED_AVAILABLE = True
-except ImportError:
-    FRED_AVAILABLE = False
-    print("[WARNING] fredapi not installed, skipping FRED tests")
-
-try:
-    import yfinance as yf
-    YFINANCE_AVAILABLE = True
-except ImportError:
-    YFINANCE_AVAILABLE = False
+# pandas / yfinance 冷启动导入较慢：这里只检查是否安装，用到时再在函数内导入
+YFINANCE_AVAILABLE = find_spec("yfinance") is not None
+if not YFINANCE_AVAILABLE:
     print("[WARNING] yfinance not installed, skipping yfinance tests")
 
 try:
@@ -34,28 +31,122 @@ except ImportError:
     REQUESTS_AVAILABLE = False
     print("[WARNING] requests not installed, skipping DeFi Llama tests")
 
+PANDAS_AVAILABLE = find_spec("pandas") is not None
+if not PANDAS_AVAILABLE:
+    print("[WARNING] pandas not installed, may affect data processing")
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+if not NUMPY_AVAILABLE:
+    print("[WARNING] numpy not installed, skipping FRED tests")
+# DataFrame.to_markdown 依赖 tabulate（按显示宽度对齐中文）；缺失时退回逐行格式化
+MARKDOWN_AVAILABLE = PANDAS_AVAILABLE and find_spec("tabulate") is not None
+
 try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
+    import asyncio
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
 except ImportError:
-    PANDAS_AVAILABLE = False
-    print("[WARNING] pandas not installed, may affect data processing")
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import requests_cache
+    REQUESTS_CACHE_AVAILABLE = True
+except ImportError:
+    REQUESTS_CACHE_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
 
 # 配置
 FRED_API_KEY = os.getenv("FRED_API_KEY", "bd89c0475f61d7555dee50daed12185f")
 DEFILLAMA_API_BASE = "https://api.llama.fi"
+FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
 TEST_DATE = "2025-01-06"
+# 测试日期及 30 天回看起点只解析一次，各探测函数直接复用
+TEST_DT = datetime.strptime(TEST_DATE, "%Y-%m-%d")
+START_DT = (TEST_DT - timedelta(days=30)).strftime("%Y-%m-%d")
+# 下方用到的全部 FRED 序列，预先并发拉取
+FRED_SERIES_IDS = ["WALCL", "WTREGEN", "RRPONTSYD", "DGS2", "T10Y2Y"]
+FRED_CONCURRENCY = 6  # FRED 限频 120 次/分钟
+# 下方用到的全部 yfinance 代码，一次 yf.download 批量拉取
+YF_SYMBOLS = ["DX-Y.NYB", "^TNX", "^IRX", "^GSPC", "^NDX", "CNH=X", "ETH-USD", "BTC-USD"]
+YF_START = "2025-01-01"
+YF_END = "2025-01-10"
+DEFILLAMA_ENDPOINTS = ["stablecoins"]
+# 暂无数据源的指标：静态列表，按层级打印后一次性并入 not_found
+UNSUPPORTED_INDICATORS = [
+    {"层级": 2, "指标": "Stablecoin Exchange Reserve", "代码": "CryptoQuant", "原因": "需要 CryptoQuant API"},
+    {"层级": 2, "指标": "BTC ETF Net Inflow", "代码": "Farside", "原因": "需要 Farside API"},
+    {"层级": 2, "指标": "Coinbase Premium Gap", "代码": "CryptoQuant", "原因": "需要 CryptoQuant API"},
+    {"层级": 2, "指标": "BTC Exchange Reserve", "代码": "Glassnode", "原因": "需要 Glassnode API"},
+    {"层级": 3, "指标": "BTC Dominance", "代码": "BTC.D", "原因": "需要 TradingView API"},
+    {"层级": 3, "指标": "TOTAL3", "代码": "TradingView", "原因": "需要 TradingView API"},
+    {"层级": 3, "指标": "OTHERS.D", "代码": "TradingView", "原因": "需要 TradingView API"},
+    {"层级": 4, "指标": "Funding Rate", "代码": "交易所API", "原因": "需要交易所API (Binance/OKX等)"},
+    {"层级": 4, "指标": "Open Interest", "代码": "Coinglass", "原因": "需要 Coinglass API"},
+    {"层级": 4, "指标": "Long/Short Ratio", "代码": "交易所API", "原因": "需要交易所API"},
+    {"层级": 4, "指标": "Fear & Greed Index", "代码": "Alternative.me", "原因": "需要 Alternative.me API"},
+    {"层级": 4, "指标": "Liquidation Heatmap", "代码": "Coinglass", "原因": "需要 Coinglass API"},
+]
+# 测试日期固定，接口结果缓存到本地，重复运行时不再请求网络
+CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "test_indicators"
+CACHE_TTL = 24 * 3600
+# DeFi Llama 数据至多每小时更新；本地有 Redis 时缓存原始响应，多次运行共享
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+DEFILLAMA_REDIS_TTL = 3600
+
+
+def load_cached(name):
+    """读取本地缓存的对象（DataFrame / NumPy 数组）；不存在或已过期时返回 None"""
+    path = CACHE_DIR / f"{name}.pkl"
+    if not path.exists() or time.time() - path.stat().st_mtime > CACHE_TTL:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
 
-# 初始化FRED
-fred = None
-if FRED_AVAILABLE and FRED_API_KEY:
+def save_cached(name, obj):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_DIR / f"{name}.pkl", "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+# HTTP 连接池：复用 keep-alive 连接
+SESSION = None
+if REQUESTS_AVAILABLE:
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    if REQUESTS_CACHE_AVAILABLE:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        SESSION = requests_cache.CachedSession(
+            str(CACHE_DIR / "http"), backend="sqlite", expire_after=CACHE_TTL
+        )
+    else:
+        SESSION = requests.Session()
+    SESSION.mount("https://", HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    ))
+
+# Redis 不可达或 REDIS_URL 无效时退回直接请求
+redis_client = None
+if REDIS_AVAILABLE:
     try:
-        fred = Fred(api_key=FRED_API_KEY)
-        print("[OK] FRED API client initialized successfully")
-    except Exception as e:
-        print(f"[ERROR] FRED API initialization failed: {e}")
-elif not FRED_AVAILABLE:
-    print("[WARNING] FRED API unavailable (library not installed)")
+        redis_client = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+        redis_client.ping()
+    except (redis.RedisError, ValueError):  # REDIS_URL 格式错误时 from_url 抛 ValueError
+        redis_client = None
 
 print(f"\n{'='*80}")
 print(f"Pentosh1 Macro Indicators Data Availability Test")
@@ -68,9 +159,154 @@ results = {
     "partial": []
 }
 
+
+def fred_params(series_id, start, end):
+    return {
+        "series_id": series_id,
+        "api_key": FRED_API_KEY,
+        "observation_start": start,
+        "observation_end": end,
+        "file_type": "json",
+    }
+
+
+def parse_fred(body):
+    """FRED observations JSON -> (datetime64[D] 日期数组, float64 数值数组)，跳过缺失值 "." """
+    import numpy as np
+    data = orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
+    observations = [
+        obs for obs in data.get("observations", [])
+        if obs.get("value") not in (None, ".", "")
+    ]
+    dates = np.array([obs["date"] for obs in observations], dtype="datetime64[D]")
+    values = np.array([float(obs["value"]) for obs in observations], dtype="float64")
+    return dates, values
+
+
+async def afetch_fred(session, sem, series_id, start, end):
+    """直接请求 FRED observations JSON，不经过 fredapi 构造 Series"""
+    async with sem:
+        async with session.get(FRED_OBSERVATIONS_URL, params=fred_params(series_id, start, end)) as resp:
+            resp.raise_for_status()
+            body = await resp.read()
+    return parse_fred(body)
+
+
+def fetch_fred(series_id, start, end):
+    """aiohttp 不可用时的同步回退"""
+    response = SESSION.get(FRED_OBSERVATIONS_URL, params=fred_params(series_id, start, end), timeout=20)
+    response.raise_for_status()
+    return parse_fred(response.content)
+
+
+async def prefetch_fred(series_ids, start, end):
+    """共享一个 ClientSession 并发拉取所有 FRED 序列；单个序列失败时返回异常对象"""
+    prefetched = {}
+    for series_id in series_ids:
+        cached = load_cached(f"fredobs_{series_id}_{start}_{end}")
+        if cached is not None:
+            prefetched[series_id] = cached
+    missing = [series_id for series_id in series_ids if series_id not in prefetched]
+    if not missing:
+        return prefetched
+
+    sem = asyncio.Semaphore(FRED_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=20)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        fetched = await asyncio.gather(
+            *(afetch_fred(session, sem, series_id, start, end) for series_id in missing),
+            return_exceptions=True,
+        )
+    for series_id, series in zip(missing, fetched):
+        if not isinstance(series, Exception):
+            save_cached(f"fredobs_{series_id}_{start}_{end}", series)
+        prefetched[series_id] = series
+    return prefetched
+
+
+def download_yfinance():
+    """一次请求批量下载全部 yfinance 代码；失败时返回 None，由 test_yfinance 逐个回退"""
+    import yfinance as yf
+    cache_name = f"yf_{YF_START}_{YF_END}"
+    cached = load_cached(cache_name)
+    if cached is not None and set(YF_SYMBOLS) <= set(cached.columns.get_level_values(0)):
+        return cached
+    try:
+        data = yf.download(
+            " ".join(YF_SYMBOLS),
+            start=YF_START,
+            end=YF_END,
+            interval="1d",
+            group_by="ticker",
+            threads=True,
+            progress=False,
+        )
+        if data is not None and not data.empty:
+            save_cached(cache_name, data)
+        return data
+    except Exception as e:
+        print(f"[WARNING] yfinance batch download failed, falling back to per-symbol requests: {e}")
+        return None
+
+
+def fetch_defillama(endpoint, params=None):
+    """返回 (HTTP 状态码, 原始响应体)；Redis 可用时先查缓存，成功响应写回缓存"""
+    key = f"defillama:{endpoint}:{sorted((params or {}).items())!r}"
+    if redis_client is not None:
+        try:
+            cached = redis_client.get(key)
+        except redis.RedisError:
+            cached = None
+        if cached:
+            return 200, cached
+
+    response = SESSION.get(f"{DEFILLAMA_API_BASE}/{endpoint}", params=params, timeout=10)
+    if response.status_code == 200 and redis_client is not None:
+        try:
+            redis_client.setex(key, DEFILLAMA_REDIS_TTL, response.content)
+        except redis.RedisError:
+            pass
+    return response.status_code, response.content
+
+
+# FRED / yfinance / DeFi Llama 三类数据源互不依赖，并发预取；
+# 各指标仍在下方按原顺序逐个判定并写入 results
+with ThreadPoolExecutor(max_workers=3) as pool:
+    fred_future = None
+    if AIOHTTP_AVAILABLE and NUMPY_AVAILABLE and FRED_API_KEY:
+        fred_future = pool.submit(lambda: asyncio.run(prefetch_fred(
+            FRED_SERIES_IDS,
+            START_DT,
+            TEST_DATE,
+        )))
+    yf_future = pool.submit(download_yfinance) if YFINANCE_AVAILABLE else None
+    llama_futures = {}
+    if REQUESTS_AVAILABLE:
+        llama_futures = {endpoint: pool.submit(fetch_defillama, endpoint) for endpoint in DEFILLAMA_ENDPOINTS}
+
+    fred_prefetched = fred_future.result() if fred_future else {}
+    yf_prefetched = yf_future.result() if yf_future else None
+    llama_prefetched = {}
+    for endpoint, future in llama_futures.items():
+        try:
+            llama_prefetched[endpoint] = future.result()
+        except Exception as e:
+            llama_prefetched[endpoint] = e
+
+
+def _closest(dates, target):
+    """返回日期数组中距 target 最近的位置及相差天数（按天做 int64 向量运算）"""
+    import numpy as np
+    days = np.asarray(dates).astype("datetime64[D]")
+    diffs = np.abs((days - np.datetime64(target, "D")).astype("int64"))
+    i = int(diffs.argmin())
+    return i, int(diffs[i])
+
+
 def test_fred(series_id, name, description=""):
     """测试FRED数据"""
-    if not FRED_AVAILABLE or not fred:
+    prefetched = fred_prefetched.get(series_id)
+    if prefetched is None and not (REQUESTS_AVAILABLE and NUMPY_AVAILABLE and FRED_API_KEY):
         results["not_found"].append({
             "指标": name,
             "代码": series_id,
@@ -80,12 +316,13 @@ def test_fred(series_id, name, description=""):
     
     try:
         # 获取最近的数据
-        end_date = TEST_DATE
-        start_date = (datetime.strptime(TEST_DATE, "%Y-%m-%d") - timedelta(days=30)).strftime("%Y-%m-%d")
+        if isinstance(prefetched, Exception):
+            raise prefetched
+        if prefetched is None:
+            prefetched = fetch_fred(series_id, START_DT, TEST_DATE)
+        dates, values = prefetched
         
-        df = fred.get_series(series_id, start=start_date, end=end_date)
-        
-        if df is None or df.empty:
+        if len(dates) == 0:
             results["not_found"].append({
                 "指标": name,
                 "代码": series_id,
@@ -94,40 +331,17 @@ def test_fred(series_id, name, description=""):
             return None
         
         # 查找最接近测试日期的数据
-        test_dt = datetime.strptime(TEST_DATE, "%Y-%m-%d")
-        closest_date = None
-        closest_value = None
-        min_diff = float('inf')
-        
-        for date, value in df.items():
-            if PANDAS_AVAILABLE and isinstance(date, pd.Timestamp):
-                date_dt = date.to_pydatetime()
-            elif hasattr(date, 'to_pydatetime'):
-                date_dt = date.to_pydatetime()
-            else:
-                date_dt = date
-            diff = abs((date_dt - test_dt).days)
-            if diff < min_diff:
-                min_diff = diff
-                closest_date = date_dt
-                closest_value = value
+        closest_idx, min_diff = _closest(dates, TEST_DT)
+        closest_value = float(values[closest_idx])
         
-        if closest_date:
-            results["found"].append({
-                "指标": name,
-                "代码": series_id,
-                "日期": closest_date.strftime("%Y-%m-%d"),
-                "值": closest_value,
-                "距离测试日期": f"{min_diff}天"
-            })
-            return closest_value
-        else:
-            results["not_found"].append({
-                "指标": name,
-                "代码": series_id,
-                "原因": "未找到接近日期的数据"
-            })
-            return None
+        results["found"].append({
+            "指标": name,
+            "代码": series_id,
+            "日期": str(dates[closest_idx]),
+            "值": closest_value,
+            "距离测试日期": f"{min_diff}天"
+        })
+        return closest_value
             
     except Exception as e:
         results["not_found"].append({
@@ -146,11 +360,13 @@ def test_yfinance(symbol, name, description=""):
             "原因": "yfinance库未安装"
         })
         return None
+    import yfinance as yf
     try:
-        ticker = yf.Ticker(symbol)
-        
-        # 获取历史数据
-        hist = ticker.history(start="2025-01-01", end="2025-01-10", interval="1d")
+        # 优先使用批量下载的结果；多代码合并后日期是并集，去掉该代码全空的行
+        if yf_prefetched is not None and symbol in yf_prefetched.columns.get_level_values(0):
+            hist = yf_prefetched[symbol].dropna(how="all")
+        else:
+            hist = yf.Ticker(symbol).history(start=YF_START, end=YF_END, interval="1d")
         
         if hist is None or hist.empty:
             results["not_found"].append({
@@ -160,43 +376,19 @@ def test_yfinance(symbol, name, description=""):
             })
             return None
         
-        # 查找测试日期的数据
-        if PANDAS_AVAILABLE:
-            test_date = pd.Timestamp(TEST_DATE)
-        else:
-            test_date = datetime.strptime(TEST_DATE, "%Y-%m-%d")
-            
-        if PANDAS_AVAILABLE and test_date in hist.index:
-            value = hist.loc[test_date, "Close"]
-            results["found"].append({
-                "指标": name,
-                "代码": symbol,
-                "日期": TEST_DATE,
-                "值": float(value),
-                "距离测试日期": "0天"
-            })
-            return float(value)
-        else:
-            # 查找最接近的日期
-            if PANDAS_AVAILABLE:
-                closest_idx = hist.index.get_indexer([test_date], method='nearest')[0]
-                closest_date = hist.index[closest_idx]
-                closest_value = hist.loc[closest_date, "Close"]
-                diff = abs((closest_date - test_date).days)
-            else:
-                # 简单查找
-                closest_date = hist.index[0]
-                closest_value = hist.iloc[0]["Close"]
-                diff = abs((closest_date - test_date).days) if hasattr(closest_date, '__sub__') else 0
-            
-            results["found"].append({
-                "指标": name,
-                "代码": symbol,
-                "日期": closest_date.strftime("%Y-%m-%d"),
-                "值": float(closest_value),
-                "距离测试日期": f"{diff}天"
-            })
-            return float(closest_value)
+        # 查找最接近测试日期的数据（命中测试日期时距离为 0）
+        closest_idx, diff = _closest(hist.index.values, TEST_DT)
+        closest_date = hist.index[closest_idx]
+        closest_value = hist["Close"].iloc[closest_idx]
+        
+        results["found"].append({
+            "指标": name,
+            "代码": symbol,
+            "日期": closest_date.strftime("%Y-%m-%d"),
+            "值": float(closest_value),
+            "距离测试日期": f"{diff}天"
+        })
+        return float(closest_value)
             
     except Exception as e:
         results["not_found"].append({
@@ -216,11 +408,16 @@ def test_defillama(endpoint, name, params=None):
         })
         return None
     try:
-        url = f"{DEFILLAMA_API_BASE}/{endpoint}"
-        response = requests.get(url, params=params, timeout=10)
+        fetched = llama_prefetched.get(endpoint) if params is None else None
+        if isinstance(fetched, Exception):
+            raise fetched
+        if fetched is None:
+            fetched = fetch_defillama(endpoint, params)
+        status_code, body = fetched
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
+            # /stablecoins 返回数 MB 的 JSON，orjson 解析明显快于标准库 json
+            data = orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
             results["found"].append({
                 "指标": name,
                 "端点": endpoint,
@@ -232,7 +429,7 @@ def test_defillama(endpoint, name, params=None):
             results["not_found"].append({
                 "指标": name,
                 "端点": endpoint,
-                "原因": f"HTTP {response.status_code}"
+                "原因": f"HTTP {status_code}"
             })
             return None
             
@@ -244,6 +441,13 @@ def test_defillama(endpoint, name, params=None):
         })
         return None
 
+def print_unsupported(layer):
+    """打印某一层级中暂无数据源的指标"""
+    for it in UNSUPPORTED_INDICATORS:
+        if it["层级"] == layer:
+            print(f"- {it['指标']} - ❌ {it['原因']}")
+
+
 # ==================== 第一层级：全球宏观"水源" ====================
 print("第一层级：全球宏观水源 (Global Liquidity)\n")
 
@@ -303,45 +507,11 @@ print("\n第二层级：Crypto 原生燃料 (On-Chain/Flow Liquidity)\n")
 print("1. Stablecoin Market Cap...")
 test_defillama("stablecoins", "Stablecoin Market Cap")
 
-# 2-5. 其他指标不在我们的库中
-print("2. Stablecoin Exchange Reserve - ❌ 需要 CryptoQuant API")
-results["not_found"].append({
-    "指标": "Stablecoin Exchange Reserve",
-    "代码": "CryptoQuant",
-    "原因": "需要 CryptoQuant API"
-})
-
-print("3. BTC ETF Net Inflow - ❌ 需要 Farside API")
-results["not_found"].append({
-    "指标": "BTC ETF Net Inflow",
-    "代码": "Farside",
-    "原因": "需要 Farside API"
-})
-
-print("4. Coinbase Premium Gap - ❌ 需要 CryptoQuant API")
-results["not_found"].append({
-    "指标": "Coinbase Premium Gap",
-    "代码": "CryptoQuant",
-    "原因": "需要 CryptoQuant API"
-})
-
-print("5. BTC Exchange Reserve - ❌ 需要 Glassnode API")
-results["not_found"].append({
-    "指标": "BTC Exchange Reserve",
-    "代码": "Glassnode",
-    "原因": "需要 Glassnode API"
-})
+print_unsupported(2)
 
 # ==================== 第三层级：市场结构与轮动 ====================
 print("\n第三层级：市场结构与轮动 (Market Structure & Rotation)\n")
 
-print("1. BTC Dominance - ❌ 需要 TradingView API")
-results["not_found"].append({
-    "指标": "BTC Dominance",
-    "代码": "BTC.D",
-    "原因": "需要 TradingView API"
-})
-
 # 2. ETH/BTC Ratio
 print("2. ETH/BTC Ratio...")
 eth = test_yfinance("ETH-USD", "ETH (以太坊)")
@@ -356,89 +526,99 @@ if eth and btc:
         "距离测试日期": "计算值"
     })
 
-print("3. TOTAL3 - ❌ 需要 TradingView API")
-results["not_found"].append({
-    "指标": "TOTAL3",
-    "代码": "TradingView",
-    "原因": "需要 TradingView API"
-})
-
-print("4. OTHERS.D - ❌ 需要 TradingView API")
-results["not_found"].append({
-    "指标": "OTHERS.D",
-    "代码": "TradingView",
-    "原因": "需要 TradingView API"
-})
+print_unsupported(3)
 
 # ==================== 第四层级：情绪与博弈 ====================
 print("\n第四层级：情绪与博弈 (Sentiment & Positioning)\n")
 
-print("1. Funding Rate - ❌ 需要交易所API")
-results["not_found"].append({
-    "指标": "Funding Rate",
-    "代码": "交易所API",
-    "原因": "需要交易所API (Binance/OKX等)"
-})
-
-print("2. Open Interest - ❌ 需要 Coinglass API")
-results["not_found"].append({
-    "指标": "Open Interest",
-    "代码": "Coinglass",
-    "原因": "需要 Coinglass API"
-})
-
-print("3. Long/Short Ratio - ❌ 需要交易所API")
-results["not_found"].append({
-    "指标": "Long/Short Ratio",
-    "代码": "交易所API",
-    "原因": "需要交易所API"
-})
-
-print("4. Fear & Greed Index - ❌ 需要 Alternative.me API")
-results["not_found"].append({
-    "指标": "Fear & Greed Index",
-    "代码": "Alternative.me",
-    "原因": "需要 Alternative.me API"
-})
-
-print("5. Liquidation Heatmap - ❌ 需要 Coinglass API")
-results["not_found"].append({
-    "指标": "Liquidation Heatmap",
-    "代码": "Coinglass",
-    "原因": "需要 Coinglass API"
-})
+print_unsupported(4)
+results["not_found"].extend(UNSUPPORTED_INDICATORS)
 
 # ==================== 输出结果 ====================
-print(f"\n{'='*80}")
-print("📊 测试结果汇总")
-print(f"{'='*80}\n")
+# 汇总先拼成一个字符串再一次写出，避免逐行 print 反复编码/刷新 stdout
+
 
-print(f"[FOUND] Data found ({len(results['found'])} items):")
-print("-" * 80)
-for item in results["found"]:
+def found_row(item):
+    if "值" in item or "value" in item:
+        return {
+            "指标": item['指标'],
+            "代码": item.get('代码', item.get('code', '')),
+            "值": item.get('值') or item.get('value', 'N/A'),
+            "备注": item.get('距离测试日期', item.get('days_away', '')),
+        }
+    return {
+        "指标": item['指标'],
+        "代码": item.get('端点', item.get('endpoint', '')),
+        "值": "",
+        "备注": item.get('状态', item.get('status', '')),
+    }
+
+
+def missing_row(item):
+    return {
+        "指标": item['指标'],
+        "代码": item.get('代码') or item.get('code') or item.get('端点') or item.get('endpoint') or '',
+        "原因": item.get('原因') or item.get('reason') or '',
+    }
+
+
+def format_section(items, row, line):
+    """有 tabulate 时整段交给 DataFrame.to_markdown，否则逐行格式化"""
+    if not items:
+        return []
+    if MARKDOWN_AVAILABLE:
+        import pandas as pd
+        return [pd.DataFrame([row(item) for item in items]).to_markdown(index=False, floatfmt=".4f")]
+    return [line(item) for item in items]
+
+
+def format_found(item):
     if "值" in item or "value" in item:
         val = item.get('值') or item.get('value', 'N/A')
+        code = item.get('代码', item.get('code', ''))
+        days_away = item.get('距离测试日期', item.get('days_away', ''))
         if isinstance(val, (int, float)):
-            print(f"  [OK] {item['指标']:30s} | {item.get('代码', item.get('code', '')):20s} | Value: {val:.4f} | {item.get('距离测试日期', item.get('days_away', ''))}")
-        else:
-            print(f"  [OK] {item['指标']:30s} | {item.get('代码', item.get('code', '')):20s} | Value: {val} | {item.get('距离测试日期', item.get('days_away', ''))}")
-    else:
-        print(f"  [OK] {item['指标']:30s} | {item.get('端点', item.get('endpoint', '')):20s} | {item.get('状态', item.get('status', ''))}")
+            return f"  [OK] {item['指标']:30s} | {code:20s} | Value: {val:.4f} | {days_away}"
+        return f"  [OK] {item['指标']:30s} | {code:20s} | Value: {val} | {days_away}"
+    return f"  [OK] {item['指标']:30s} | {item.get('端点', item.get('endpoint', '')):20s} | {item.get('状态', item.get('status', ''))}"
 
-if results["partial"]:
-    print(f"\n[PARTIAL] Partial data ({len(results['partial'])} items):")
-    print("-" * 80)
-    for item in results["partial"]:
-        print(f"  [PARTIAL] {item['指标']:30s} | {item.get('代码', item.get('code', '')):20s} | {item.get('原因', item.get('reason', ''))}")
-
-print(f"\n[NOT FOUND] Data not found ({len(results['not_found'])} items):")
-print("-" * 80)
-for item in results["not_found"]:
-    code = item.get('代码') or item.get('code') or item.get('端点') or item.get('endpoint') or ''
-    reason = item.get('原因') or item.get('reason') or ''
-    print(f"  [MISSING] {item['指标']:30s} | {code:20s} | {reason}")
 
-print(f"\n{'='*80}")
-print(f"Total: {len(results['found'])} available | {len(results['partial'])} partial | {len(results['not_found'])} unavailable")
-print(f"{'='*80}\n")
+def format_partial(item):
+    return f"  [PARTIAL] {item['指标']:30s} | {item.get('代码', item.get('code', '')):20s} | {item.get('原因', item.get('reason', ''))}"
+
+
+def format_not_found(item):
+    row = missing_row(item)
+    return f"  [MISSING] {row['指标']:30s} | {row['代码']:20s} | {row['原因']}"
+
+
+summary = [
+    f"\n{'='*80}",
+    "📊 测试结果汇总",
+    f"{'='*80}\n",
+    f"[FOUND] Data found ({len(results['found'])} items):",
+    "-" * 80,
+]
+summary += format_section(results["found"], found_row, format_found)
+
+if results["partial"]:
+    summary += [
+        f"\n[PARTIAL] Partial data ({len(results['partial'])} items):",
+        "-" * 80,
+    ]
+    summary += format_section(results["partial"], missing_row, format_partial)
+
+summary += [
+    f"\n[NOT FOUND] Data not found ({len(results['not_found'])} items):",
+    "-" * 80,
+]
+summary += format_section(results["not_found"], missing_row, format_not_found)
+
+summary += [
+    f"\n{'='*80}",
+    f"Total: {len(results['found'])} available | {len(results['partial'])} partial | {len(results['not_found'])} unavailable",
+    f"{'='*80}\n",
+]
+sys.stdout.write("\n".join(summary) + "\n")
+sys.stdout.flush()
 
@@ -32,6 +32,11 @@ print(f"   文件大小: {os.path.getsize(db_path) / 1024 / 1024:.2f} MB")
 # 连接数据库
 try:
     conn = sqlite3.connect(db_path)
+    # WAL 下读查询不阻塞正在运行的 history_miner；加大页缓存并用 mmap 读取，减少全表扫描的 I/O
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA cache_size=-200000')  # 约 200 MB
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=268435456')  # 256 MB
     cursor = conn.cursor()
     
     # 1. 检查表是否存在
@@ -76,6 +81,13 @@ try:
     print("3️⃣ 索引信息")
     print("=" * 60)
     
+    # 旧版本建的表可能缺少统计查询依赖的索引（与 history_miner.init_database 同名，已存在则跳过）
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_source ON history_news(source)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_publish_time ON history_news(publish_time)')
+    # url 的 UNIQUE 约束自带唯一索引，重复 URL 检查可直接走索引
+    cursor.execute('ANALYZE history_news')
+    conn.commit()
+    
     cursor.execute('''
         SELECT name, sql FROM sqlite_master 
         WHERE type='index' AND tbl_name='history_news'
@@ -148,7 +160,18 @@ try:
     print("\n" + "=" * 60)
     print("5️⃣ 示例数据（最近5条）")
     print("=" * 60)
-    
+
+    # index_id 为 INTEGER PRIMARY KEY 时即 rowid 别名，倒序取 5 条无需排序：
+    #   EXPLAIN QUERY PLAN -> SCAN history_news（无 USE TEMP B-TREE FOR ORDER BY）
+    # 旧表若不是，则补建倒序索引，避免全表排序
+    index_id_is_rowid = any(
+        name == 'index_id' and pk and col_type.upper() == 'INTEGER'
+        for _, name, col_type, _, _, pk in columns
+    )
+    if not index_id_is_rowid:
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_news_id_desc ON history_news(index_id DESC)')
+        conn.commit()
+
     cursor.execute('''
         SELECT index_id, id, url, title, source, publish_time, crawled_at
         FROM history_news
@@ -174,14 +197,15 @@ try:
     print("=" * 60)
     
     # 检查空值
-    cursor.execute('SELECT COUNT(*) FROM history_news WHERE title IS NULL OR title = ""')
-    empty_title = cursor.fetchone()[0]
-    
-    cursor.execute('SELECT COUNT(*) FROM history_news WHERE content IS NULL OR content = ""')
-    empty_content = cursor.fetchone()[0]
-    
-    cursor.execute('SELECT COUNT(*) FROM history_news WHERE url IS NULL OR url = ""')
-    empty_url = cursor.fetchone()[0]
+    # 单次扫描同时统计三类空值
+    cursor.execute('''
+        SELECT
+            COALESCE(SUM(CASE WHEN title IS NULL OR title = '' THEN 1 ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN content IS NULL OR content = '' THEN 1 ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN url IS NULL OR url = '' THEN 1 ELSE 0 END), 0)
+        FROM history_news
+    ''')
+    empty_title, empty_content, empty_url = cursor.fetchone()
     
     print(f"\n   📋 空值统计:")
     print(f"      标题为空: {empty_title} 条")
@@ -207,19 +231,20 @@ try:
     print("7️⃣ Pandas DataFrame 统计")
     print("=" * 60)
     
-    df = pd.read_sql_query('SELECT * FROM history_news', conn)
+    # 只取一行推断 dtype，行数/列名复用上面的 COUNT(*) 与 PRAGMA table_info，避免整表读入内存
+    df_head = pd.read_sql_query('SELECT * FROM history_news LIMIT 1', conn)
     
     print(f"\n   📊 DataFrame 信息:")
-    print(f"      行数: {len(df):,}")
-    print(f"      列数: {len(df.columns)}")
+    print(f"      行数: {total_count:,}")
+    print(f"      列数: {len(columns)}")
     print(f"\n   列名列表:")
-    for i, col in enumerate(df.columns, 1):
-        print(f"      {i}. {col}")
+    for i, col in enumerate(columns, 1):
+        print(f"      {i}. {col[1]}")
     
-    print(f"\n   数据类型:")
-    print(df.dtypes.to_string())
+    print(f"\n   数据类型（按首行推断）:")
+    print(df_head.dtypes.to_string())
     
-    print(f"\n   内存使用: {df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB")
+    print(f"\n   数据库文件大小: {os.path.getsize(db_path) / 1024 / 1024:.2f} MB")
     
     conn.close()
     
@@ -5,17 +5,151 @@
 import feedparser
 import pandas as pd
 from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from datetime import datetime
 import re
 import time
 import os
 import sys
 import requests
-import xml.etree.ElementTree as ET
+from lxml import etree
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlparse
 import trafilatura
 import hashlib
 import sqlite3
+import gzip
+import json
+import queue
+import threading
+import csv
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# 月度 sitemap / 文章抓取都是网络 I/O，用线程池让请求重叠
+SITEMAP_WORKERS = 8
+ARTICLE_WORKERS = 16
+# 文章请求的令牌桶限速：持续每秒 5 次，允许突发 10 次（线程池并发，但总请求速率受控）
+ARTICLE_RATE = 5.0
+ARTICLE_BURST = 10
+
+# trafilatura 失败时的正文选择器，按优先级排列
+CONTENT_SELECTORS = (
+    'article',
+    '[class*="article"]',
+    '[class*="post-content"]',
+    '[class*="content"]',
+    'main',
+)
+
+def _article_id(url):
+    """
+    文章 ID：URL 的 MD5 前 16 位（见 DATABASE_GUIDE.md，下游 RAG 导入沿用该 ID，不能换算法）
+    只用作去重键，usedforsecurity=False 让 FIPS 环境下也走快速路径
+    """
+    return hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+def _lower_url(url):
+    """sitemap 里的 URL 基本已是小写：islower() 只做一次 C 层扫描，确有大写字母时才复制出小写副本"""
+    return url if url.islower() else url.lower()
+
+
+# sitemap 解析结果的本地缓存目录（gzip JSON，每个 sitemap 一个文件）
+SITEMAP_CACHE_DIR = os.path.join('.cache', 'sitemaps')
+
+# 主 sitemap 中的月度 sitemap 链接（含 post- 或 sitemap，忽略大小写，一次扫描）
+MONTHLY_SITEMAP_RE = re.compile(r'post-|sitemap', re.IGNORECASE)
+
+# 月度 sitemap URL 中的年月（如 post-2024-03）
+SITEMAP_MONTH_RE = re.compile(r'(\d{4})-(\d{2})(?!\d)')
+
+# URL 中需要归一的分隔符：任意空白，或后面还跟着分隔符的连字符（单个连字符本身已是归一形式，不匹配）
+SLUG_SEPARATOR_RE = re.compile(r'(?:\s|-(?=[\s-]))[\s-]*', re.ASCII)
+
+def _sitemap_cache_path(sitemap_url):
+    name = hashlib.md5(sitemap_url.encode(), usedforsecurity=False).hexdigest()
+    return os.path.join(SITEMAP_CACHE_DIR, f"{name}.json.gz")
+
+
+def _load_sitemap_cache(sitemap_url):
+    """读取 sitemap 缓存：{'urls', 'etag', 'last_modified', 'cached_month'}；不存在或损坏时返回 None"""
+    try:
+        with gzip.open(_sitemap_cache_path(sitemap_url), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_sitemap_cache(sitemap_url, urls, etag=None, last_modified=None):
+    """写入 sitemap 缓存（先写临时文件再替换，避免中断时留下半个文件）"""
+    if not urls:
+        return
+    path = _sitemap_cache_path(sitemap_url)
+    try:
+        os.makedirs(SITEMAP_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            now = datetime.now()
+            json.dump({
+                'urls': urls,
+                'etag': etag,
+                'last_modified': last_modified,
+                'cached_month': [now.year, now.month],
+            }, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"   ⚠️ 写入 sitemap 缓存失败: {e}")
+
+
+def _is_closed_month_sitemap(sitemap_url, cached):
+    """
+    URL 带年月，且缓存写入时该月已经结束：该月文章列表不再变化，缓存可永久使用
+    （月内写入的缓存可能不完整，仍需条件请求校验）
+    """
+    match = SITEMAP_MONTH_RE.search(sitemap_url)
+    if not match or not cached.get('cached_month'):
+        return False
+    return (int(match.group(1)), int(match.group(2))) < tuple(cached['cached_month'])
+
+
+# 摘要截断点：句末标点且后面是空白
+SENTENCE_END_RE = re.compile(r'[.!?。！？](?=[ \n\r\t])')
+
+# 发布时间中的 YYYY-MM-DD 日期部分
+ISO_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+
+def _parse_publish_time(time_str):
+    """
+    解析发布时间：先用正则确认含 YYYY-MM-DD，不像日期的文本（如 "Mar 05"）直接跳过，不走异常路径；
+    以日期开头的按 ISO 8601 解析，解析不了时退回只取日期部分
+    """
+    match = ISO_DATE_RE.search(time_str)
+    if not match:
+        return None
+    if match.start() == 0:
+        try:
+            return datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+        except ValueError:
+            pass
+    try:
+        return datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+# sitemap 中的链接节点（标准命名空间 / 无命名空间）
+SITEMAP_LOC_TAGS = ('{http://www.sitemaps.org/schemas/sitemap/0.9}loc', 'loc')
 
 # 设置 Windows 控制台编码为 UTF-8
 if sys.platform == 'win32':
@@ -24,6 +158,101 @@ if sys.platform == 'win32':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
 
+class TokenBucket:
+    """
+    线程安全的令牌桶限速器：令牌按 rate 个/秒补充，最多积攒 burst 个；
+    取不到令牌的线程只休眠到下一个令牌产生，不再按固定间隔串行休眠
+    """
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CheckpointWriter:
+    """
+    后台写库线程：抓取结果放入有界队列，由唯一的写线程持有 SQLite 连接，
+    每攒满 batch_size 篇或距上次写入超过 flush_interval 秒就批量写一次，主线程不再等待写盘
+    """
+    
+    def __init__(self, miner, db_path, batch_size=64, flush_interval=1.0, maxsize=256):
+        self.miner = miner
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.saved_count = 0  # 已成功写入的文章数
+        self.unsaved = []  # 写入失败、尚未落盘的文章
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+    
+    def put(self, article):
+        """提交一篇文章；队列满时阻塞，避免抓取远快于写库时内存无限增长"""
+        self._queue.put(article)
+    
+    def close(self):
+        """写完队列中剩余的文章并结束写线程（可重复调用）；返回是否全部写入成功"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        return not self.unsaved
+    
+    def _run(self):
+        self._conn = None
+        buffer = self.unsaved
+        last_flush = time.monotonic()
+        try:
+            while True:
+                timeout = max(0.0, last_flush + self.flush_interval - time.monotonic())
+                try:
+                    article = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    article = False  # 超时：只触发按时间的写入
+                if article is None:
+                    break
+                if article:
+                    buffer.append(article)
+                if buffer and (len(buffer) >= self.batch_size
+                               or time.monotonic() - last_flush >= self.flush_interval):
+                    self._flush(buffer)
+                    last_flush = time.monotonic()
+                elif not buffer:
+                    last_flush = time.monotonic()
+            if buffer:
+                self._flush(buffer)
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+    
+    def _flush(self, buffer):
+        # 写失败时文章保留在 buffer 中，下次写入时重试；写线程本身不退出，保证队列始终被消费
+        try:
+            if self._conn is None:
+                self._conn = self.miner._connect(self.db_path)
+            self.miner._insert_articles(self._conn, buffer)
+        except Exception as e:
+            print(f"   ⚠️ 保存数据库失败: {e}")
+            return
+        self.saved_count += len(buffer)
+        buffer.clear()
+        print(f"      💾 已保存检查点（本次运行已写入 {self.saved_count} 条）")
+
+
 class HistoryNewsMiner:
     def __init__(self):
         # Pentosh1 关注的关键词（用于过滤历史文章）
@@ -170,6 +399,11 @@ class HistoryNewsMiner:
         ]
         # 合并所有关键词
         self.target_keywords = macro_keywords + institutional_keywords + regulation_keywords + risk_keywords
+        # 关键词匹配器只构建一次：有 pyahocorasick 时用自动机单次线性扫描，否则预编译组合正则
+        self._keyword_automaton = self._build_keyword_automaton(self.target_keywords) if AHOCORASICK_AVAILABLE else None
+        self._url_filter_regex = None if self._keyword_automaton is not None else self._build_keyword_regex(self.target_keywords)
+        # 正则路径的三元组预过滤：slug 与关键词没有公共三元组、也不含短关键词时必然不匹配，可跳过正则
+        self._kw_trigrams, self._short_kw_regex = self._build_trigram_prefilter(self.target_keywords)
         
         # 新闻站点配置
         self.sites = {
@@ -183,48 +417,77 @@ class HistoryNewsMiner:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        
+        # 所有线程共享一个 Session，复用 keep-alive 连接
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # 429/5xx 指数退避重试，遵循 Retry-After；单篇失败不必等到下一轮再补抓
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # 所有抓文章的线程共用一个令牌桶
+        self.rate_limiter = TokenBucket(ARTICLE_RATE, ARTICLE_BURST)
 
     def fetch_sitemap(self, sitemap_url):
-        """获取并解析 sitemap.xml"""
+        """
+        获取并流式解析 sitemap.xml（lxml iterparse，边读边释放已处理的节点）
+        解析结果按 URL 缓存在本地：已结束月份的 sitemap 不再变化，命中缓存直接返回；
+        其余 sitemap 带 ETag / Last-Modified 做条件请求，304 时复用缓存，不再下载和解析 XML
+        """
+        cached = _load_sitemap_cache(sitemap_url)
+        if cached is not None and _is_closed_month_sitemap(sitemap_url, cached):
+            return cached['urls']
+        
+        conditional_headers = {}
+        if cached is not None:
+            if cached.get('etag'):
+                conditional_headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                conditional_headers['If-Modified-Since'] = cached['last_modified']
+        
         try:
             print(f"   📍 获取站点地图: {sitemap_url}")
-            response = requests.get(sitemap_url, headers=self.headers, timeout=30)
+            response = self.session.get(sitemap_url, timeout=30, stream=True, headers=conditional_headers)
+            if response.status_code == 304 and cached is not None:
+                response.close()
+                return cached['urls']
             response.raise_for_status()
-            
-            # 解析 XML（处理命名空间）
-            try:
-                root = ET.fromstring(response.content)
-            except ET.ParseError:
-                # 如果解析失败，尝试用 BeautifulSoup
-                soup = BeautifulSoup(response.content, 'xml')
-                urls = []
-                for loc in soup.find_all('loc'):
-                    urls.append(loc.text)
-                return urls
-            
-            # 定义命名空间
-            namespaces = {
-                'sitemap': 'http://www.sitemaps.org/schemas/sitemap/0.9',
-                'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'
-            }
+            response.raw.decode_content = True  # 透明解压 gzip 传输编码
+            validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
             
             urls = []
+            try:
+                for _, elem in etree.iterparse(response.raw, tag=SITEMAP_LOC_TAGS):
+                    if elem.text:
+                        urls.append(elem.text.strip())
+                    elem.clear(keep_tail=True)
+                    # <loc> 位于 <url>/<sitemap> 之下：删掉根节点下已处理完的兄弟节点
+                    parent = elem.getparent()
+                    if parent is not None and parent.getparent() is not None:
+                        while parent.getprevious() is not None:
+                            del parent.getparent()[0]
+            except etree.XMLSyntaxError:
+                urls = None
+            finally:
+                response.close()
             
-            # 方法1: 使用命名空间查找
-            for namespace in ['{http://www.sitemaps.org/schemas/sitemap/0.9}', '']:
-                for loc in root.findall(f'.//{namespace}loc'):
-                    if loc.text:
-                        urls.append(loc.text)
-                if urls:
-                    break
-            
-            # 方法2: 如果没有找到，尝试直接查找所有 loc 标签
-            if not urls:
-                for elem in root.iter():
-                    tag = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
-                    if tag.lower() == 'loc' and elem.text:
-                        urls.append(elem.text)
+            if urls is None:
+                # XML 不规范时重新下载，用容错解析器兜底
+                response = self.session.get(sitemap_url, timeout=30)
+                response.raise_for_status()
+                root = etree.fromstring(response.content, etree.XMLParser(recover=True, huge_tree=True))
+                if root is None:
+                    return []
+                urls = [loc.strip() for loc in root.xpath('//*[local-name()="loc"]/text()') if loc.strip()]
             
+            _save_sitemap_cache(sitemap_url, urls, *validators)
             return urls
         except Exception as e:
             print(f"   ❌ 获取站点地图失败: {e}")
@@ -238,21 +501,45 @@ class HistoryNewsMiner:
         # 过滤出月度 sitemap（通常包含 post-YYYY-MM 格式）
         monthly_sitemaps = []
         for sitemap_url in sitemaps:
-            if 'post-' in sitemap_url.lower() or 'sitemap' in sitemap_url.lower():
+            if MONTHLY_SITEMAP_RE.search(sitemap_url):
                 monthly_sitemaps.append(sitemap_url)
         
         print(f"   ✅ 找到 {len(monthly_sitemaps)} 个月度站点地图")
         return monthly_sitemaps
 
-    def filter_news_urls(self, urls, keywords=None, months_back=12):
-        """过滤新闻 URL，只保留包含关键词的链接（使用正则表达式匹配）"""
-        if keywords is None:
-            keywords = self.target_keywords
-        
-        filtered_urls = []
-        cutoff_date = datetime.now() - timedelta(days=months_back * 30)
-        
-        # 构建正则表达式模式（使用单词边界）
+    @staticmethod
+    def _build_keyword_automaton(keywords):
+        """
+        构建 Aho-Corasick 自动机，匹配规则与正则版一致：
+        多词关键词按 URL slug 的连字符形式匹配；单词关键词需在命中后校验单词边界
+        """
+        automaton = ahocorasick.Automaton()
+        for kw in keywords:
+            kw = kw.lower()
+            multi_word = ' ' in kw or '-' in kw
+            key = re.sub(r'[\s-]+', '-', kw) if multi_word else kw
+            automaton.add_word(key, (len(key), not multi_word))
+        automaton.make_automaton()
+        return automaton
+
+    @staticmethod
+    def _automaton_search(automaton, text):
+        """text 中是否存在满足边界要求的关键词命中"""
+        last = len(text) - 1
+        for end, (length, need_boundary) in automaton.iter(text):
+            if not need_boundary:
+                return True
+            start = end - length + 1
+            if start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+                continue
+            if end < last and (text[end + 1].isalnum() or text[end + 1] == '_'):
+                continue
+            return True
+        return False
+
+    @staticmethod
+    def _build_keyword_regex(keywords):
+        """构建组合正则表达式（使用单词边界）"""
         # 将关键词转换为正则表达式，使用 \b 确保单词边界匹配
         patterns = []
         for kw in keywords:
@@ -267,55 +554,144 @@ class HistoryNewsMiner:
                 pattern = r'\b' + escaped_kw + r'\b'
             patterns.append(pattern)
         
-        # 组合所有模式
-        combined_pattern = '|'.join(patterns)
-        regex = re.compile(combined_pattern, re.IGNORECASE)
+        # 组合所有模式：关键词已小写、调用方只拿 url.lower() 匹配，不需要 IGNORECASE；
+        # URL 是 ASCII，re.ASCII 让 \b / \s 走 ASCII 字符表
+        return re.compile('|'.join(patterns), re.ASCII)
+
+    @classmethod
+    def _build_trigram_prefilter(cls, keywords):
+        """
+        返回 (关键词三元组集合, 短关键词正则)
+        关键词按空格/连字符拆成词段，命中时 URL 必然包含每个词段，因此取长度 >= 3 的词段的三元组；
+        所有词段都短于 3 的关键词（m2、qe、oi 等）无法用三元组表示，单独编一个小正则
+        """
+        trigrams = set()
+        short_keywords = []
+        for kw in keywords:
+            pieces = [p for p in re.split(r'[\s-]+', kw.lower()) if len(p) >= 3]
+            if not pieces:
+                short_keywords.append(kw)
+            for piece in pieces:
+                trigrams.update(piece[i:i + 3] for i in range(len(piece) - 2))
+        short_regex = cls._build_keyword_regex(short_keywords) if short_keywords else None
+        return trigrams, short_regex
+
+    def _may_match(self, text):
+        """三元组预过滤：返回 False 时 text 一定不含任何默认关键词"""
+        if not self._kw_trigrams.isdisjoint(text[i:i + 3] for i in range(len(text) - 2)):
+            return True
+        return self._short_kw_regex is not None and self._short_kw_regex.search(text) is not None
+
+    def filter_news_urls(self, urls, keywords=None, months_back=12):
+        """过滤新闻 URL，只保留包含关键词的链接（默认关键词走 Aho-Corasick 自动机，否则用正则表达式匹配）"""
+        if keywords is None and self._keyword_automaton is not None:
+            automaton = self._keyword_automaton
+            filtered_urls = []
+            for url in urls:
+                u = _lower_url(url)
+                # 自动机里多词关键词是单连字符形式；正则的 [\s-]+ 还能跨过连续的空白/连字符，先归一
+                if '/news/' in u and self._automaton_search(automaton, SLUG_SEPARATOR_RE.sub('-', u)):
+                    filtered_urls.append(url)
+            return filtered_urls
+        if keywords is None:
+            return self._filter_with_prefilter(urls)
+        # 自定义关键词才现场编译正则
+        regex = self._build_keyword_regex(keywords)
         
+        filtered_urls = []
         for url in urls:
+            u = _lower_url(url)
             # 只保留 /news/ 类型的链接
-            if '/news/' not in url.lower():
+            if '/news/' not in u:
                 continue
             
             # 使用正则表达式匹配
-            if regex.search(url.lower()):
+            if regex.search(u):
+                filtered_urls.append(url)
+        
+        return filtered_urls
+
+    def _filter_with_prefilter(self, urls):
+        """
+        默认关键词的正则路径：URL 在 '/news/' 之后切开（关键词不含 '/'，匹配不会跨越切点），
+        前缀（站点 + /news/）各 URL 相同，结果按前缀缓存；slug 先过三元组预过滤，幸存者再跑正则
+        """
+        regex = self._url_filter_regex
+        prefix_hits = {}
+        filtered_urls = []
+        for url in urls:
+            u = _lower_url(url)
+            # 只保留 /news/ 类型的链接
+            pos = u.find('/news/')
+            if pos < 0:
+                continue
+            split = pos + len('/news/')
+            prefix, slug = u[:split], u[split:]
+            
+            hit = prefix_hits.get(prefix)
+            if hit is None:
+                hit = prefix_hits[prefix] = regex.search(prefix) is not None
+            if hit or (self._may_match(slug) and regex.search(slug)):
                 filtered_urls.append(url)
         
         return filtered_urls
 
-    def extract_article_content(self, url):
-        """使用 trafilatura 提取文章正文（完整内容，不截断）"""
+    def _fetch_html(self, url):
+        """
+        通过共享 Session 下载文章 HTML；失败返回 None
+        响应头声明了 charset 时直接按它解码；否则返回原始字节，由解析器按 <meta charset> 识别，
+        不调用 apparent_encoding（chardet 会扫描整个响应体）
+        """
+        try:
+            self.rate_limiter.acquire()
+            response = self.session.get(url, timeout=10)
+            response.raise_for_status()
+            if 'charset=' in response.headers.get('Content-Type', '').lower():
+                return response.text
+            return response.content
+        except Exception:
+            return None
+
+    def extract_article_content(self, html):
+        """
+        从已下载的 HTML 提取文章正文（完整内容，不截断）
+        :return: (正文, soup, metadata)
+            metadata 为 trafilatura 同一次解析得到的 {'title', 'date'}，trafilatura 失败时为 None；
+            只有走 BeautifulSoup 备用方案时才会构建 soup，两者都供元数据提取复用
+        """
         try:
-            # 方法1: 使用 trafilatura 直接从 URL 提取
-            article = trafilatura.extract(trafilatura.fetch_url(url))
-            if article and len(article.strip()) > 100:
-                return article.strip()  # 返回完整内容
+            # 方法1: 使用 trafilatura 提取，正文与元数据一次解析同时得到
+            doc = trafilatura.bare_extraction(html, include_comments=False, with_metadata=True)
+            if doc is not None and not isinstance(doc, dict):
+                doc = doc.as_dict()  # trafilatura 2.x 返回 Document 对象
+            if doc:
+                article = doc.get('text')
+                if article and len(article.strip()) > 100:
+                    metadata = {'title': doc.get('title'), 'date': doc.get('date')}
+                    return article.strip(), None, metadata  # 返回完整内容
         except Exception as e:
             pass
         
-        # 方法2: 备用方案 - requests + BeautifulSoup
+        # 方法2: 备用方案 - selectolax（Lexbor 解析 + C 层取文本），不可用时退回 BeautifulSoup
+        if SELECTOLAX_AVAILABLE:
+            return self._extract_content_selectolax(html), None, None
+        
+        try:
+            soup = BeautifulSoup(html, 'lxml')  # lxml C 解析器，比 html.parser 快一个量级
+        except Exception:
+            return None, None, None
+        
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.encoding = response.apparent_encoding or 'utf-8'
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
             # 移除脚本和样式标签
             for script in soup(["script", "style"]):
                 script.decompose()
             
             # 尝试多种选择器提取正文
-            content_selectors = [
-                'article',
-                '[class*="article"]',
-                '[class*="post-content"]',
-                '[class*="content"]',
-                'main'
-            ]
-            
             text_parts = []
-            for selector in content_selectors:
-                elements = soup.select(selector)
+            for selector in CONTENT_SELECTORS:
+                elements = soup.select(selector, limit=2)  # 只需前2个，找到即停
                 if elements:
-                    for elem in elements[:2]:  # 只取前2个
+                    for elem in elements:
                         text = elem.get_text(separator=' ', strip=True)
                         if len(text) > 200:  # 确保有足够内容
                             text_parts.append(text)
@@ -325,14 +701,42 @@ class HistoryNewsMiner:
             if text_parts:
                 full_text = ' '.join(text_parts)
                 if len(full_text) > 100:
-                    return full_text  # 返回完整内容
+                    return full_text, soup, None  # 返回完整内容
             
-            return None
+            return None, soup, None
         except Exception as e:
+            return None, soup, None
+    
+    def _extract_content_selectolax(self, html):
+        """与 BeautifulSoup 备用方案相同的选择器与阈值，解析和取文本都在 C 层完成"""
+        try:
+            tree = LexborHTMLParser(html)
+            tree.strip_tags(['script', 'style'])
+            
+            text_parts = []
+            for selector in CONTENT_SELECTORS:
+                elements = tree.css(selector)[:2]
+                if elements:
+                    for elem in elements:
+                        text = elem.text(separator=' ', strip=True)
+                        if len(text) > 200:  # 确保有足够内容
+                            text_parts.append(text)
+                    if text_parts:
+                        break
+            
+            if text_parts:
+                full_text = ' '.join(text_parts)
+                if len(full_text) > 100:
+                    return full_text
+            return None
+        except Exception:
             return None
     
-    def extract_article_metadata(self, url, content):
-        """从文章内容或 URL 提取元数据（标题、发布时间等）"""
+    def extract_article_metadata(self, url, content, html, soup=None, metadata=None):
+        """
+        从已下载的 HTML 或 URL 提取元数据（标题、发布时间等），不再重复请求
+        :param metadata: 正文提取时 trafilatura 已得到的 {'title', 'date'}，有则不再解析 HTML
+        """
         title = ""
         publish_time = None
         
@@ -343,27 +747,25 @@ class HistoryNewsMiner:
         
         # 尝试从内容中提取标题和发布时间
         if content:
-            # 使用 trafilatura 提取元数据
+            # 使用 trafilatura 提取元数据（正文提取已带出则直接复用）
             try:
-                downloaded = trafilatura.fetch_url(url)
-                if downloaded:
-                    metadata = trafilatura.extract_metadata(downloaded)
-                    if metadata:
-                        if metadata.title:
-                            title = metadata.title
-                        if metadata.date:
-                            try:
-                                publish_time = datetime.fromisoformat(str(metadata.date).replace('Z', '+00:00'))
-                            except:
-                                pass
+                if metadata is None:
+                    extracted = trafilatura.extract_metadata(html)
+                    if extracted:
+                        metadata = {'title': extracted.title, 'date': extracted.date}
+                if metadata:
+                    if metadata['title']:
+                        title = metadata['title']
+                    if metadata['date']:
+                        publish_time = _parse_publish_time(str(metadata['date']))
             except:
                 pass
             
-            # 如果 trafilatura 失败，尝试从 HTML 中提取
+            # 如果 trafilatura 失败，尝试从 HTML 中提取（复用正文提取时的 soup）
             if not publish_time:
                 try:
-                    response = requests.get(url, headers=self.headers, timeout=10)
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    if soup is None:
+                        soup = BeautifulSoup(html, 'lxml')
                     
                     # 提取标题
                     if not title or title == url_parts[-1]:
@@ -384,16 +786,9 @@ class HistoryNewsMiner:
                         if elem:
                             time_str = elem.get('datetime') or elem.get('content') or elem.get_text(strip=True)
                             if time_str:
-                                try:
-                                    # 尝试解析各种时间格式
-                                    publish_time = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+                                publish_time = _parse_publish_time(time_str)
+                                if publish_time:
                                     break
-                                except:
-                                    try:
-                                        publish_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S')
-                                        break
-                                    except:
-                                        pass
                 except:
                     pass
         
@@ -421,16 +816,9 @@ class HistoryNewsMiner:
         search_start = max(0, target_length - 100)  # 向前搜索100字
         search_end = min(len(text), target_length + 100)  # 向后搜索100字
         
-        # 查找句号、问号、感叹号
-        sentence_endings = ['.', '!', '?', '。', '！', '？']
-        best_pos = target_length
-        
-        for pos in range(search_start, search_end):
-            if text[pos] in sentence_endings:
-                # 检查后面是否有空格或换行
-                if pos + 1 < len(text) and text[pos + 1] in [' ', '\n', '\r', '\t']:
-                    best_pos = pos + 1
-                    break
+        # 查找句号、问号、感叹号（后面紧跟空白），一次 C 层扫描；endpos 多留 1 位给前瞻
+        match = SENTENCE_END_RE.search(text, search_start, search_end + 1)
+        best_pos = match.end() if match else target_length
         
         # 如果没找到句号，在目标长度处截断
         summary = text[:best_pos].strip()
@@ -441,9 +829,22 @@ class HistoryNewsMiner:
         
         return summary
 
+    def _connect(self, db_path):
+        """
+        打开数据库连接：自动提交模式（事务由调用方显式 BEGIN/COMMIT），
+        WAL 下 synchronous=NORMAL 只在检查点时 fsync；约 64 MB 页缓存让 url 唯一索引常驻内存
+        """
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')
+        return conn
+
     def init_database(self, db_path):
         """初始化数据库，创建表结构（只在表不存在时创建）"""
         conn = sqlite3.connect(db_path)
+        # WAL 模式写入数据库文件，之后的连接都沿用；写检查点时不阻塞 check_news_db 等读者
+        conn.execute('PRAGMA journal_mode=WAL')
         cursor = conn.cursor()
         
         # 检查表是否存在
@@ -530,39 +931,15 @@ class HistoryNewsMiner:
         conn.close()
     
     def load_checkpoint(self, db_path):
-        """从数据库加载检查点：返回已处理的URL集合和已保存的文章列表"""
-        processed_urls = set()
-        existing_articles = []
+        """从数据库加载检查点：只返回已保存的文章数，URL 去重改为按候选链接查库（见 find_saved_urls）"""
+        saved_count = 0
         
         if os.path.exists(db_path):
             try:
                 conn = sqlite3.connect(db_path)
-                cursor = conn.cursor()
-                
-                # 查询所有已处理的URL
-                cursor.execute('SELECT url FROM history_news')
-                urls = cursor.fetchall()
-                processed_urls = set([url[0] for url in urls])
-                
-                # 查询所有文章（包含 index_id）
-                cursor.execute('SELECT index_id, id, url, title, content, summary, source, publish_time, crawled_at FROM history_news')
-                rows = cursor.fetchall()
-                
-                for row in rows:
-                    existing_articles.append({
-                        "index_id": row[0],
-                        "id": row[1],
-                        "url": row[2],
-                        "title": row[3],
-                        "content": row[4],
-                        "summary": row[5],
-                        "source": row[6],
-                        "publish_time": row[7],
-                        "crawled_at": row[8]
-                    })
-                
+                saved_count = conn.execute('SELECT COUNT(*) FROM history_news').fetchone()[0]
                 conn.close()
-                print(f"   📂 发现数据库文件: {len(processed_urls)} 条已处理")
+                print(f"   📂 发现数据库文件: {saved_count} 条已处理")
             except Exception as e:
                 print(f"   ⚠️ 读取数据库失败: {e}")
         else:
@@ -570,45 +947,100 @@ class HistoryNewsMiner:
             self.init_database(db_path)
             print(f"   📂 创建新数据库: {db_path}")
         
-        return processed_urls, existing_articles
+        return saved_count
+
+    def find_saved_urls(self, db_path, urls, batch_size=500):
+        """
+        返回 urls 中已在数据库里的那部分
+        分批 IN 查询走 url 唯一索引，内存只与本次候选链接数有关，不随历史库增长
+        """
+        saved = set()
+        urls = list(dict.fromkeys(urls))
+        conn = sqlite3.connect(db_path)
+        try:
+            for i in range(0, len(urls), batch_size):
+                batch = urls[i:i + batch_size]
+                placeholders = ','.join('?' * len(batch))
+                saved.update(
+                    row[0] for row in conn.execute(f'SELECT url FROM history_news WHERE url IN ({placeholders})', batch)
+                )
+        finally:
+            conn.close()
+        return saved
     
     def save_checkpoint(self, articles, db_path):
-        """保存检查点：将文章保存到数据库（index_id 自动递增）"""
+        """保存检查点：一个事务内批量写入文章（index_id 自动递增，已存在的 URL 跳过）"""
         if not articles:
             return False
         
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # 确保表存在
-            self.init_database(db_path)
-            
-            # 批量插入或更新文章（使用 INSERT OR REPLACE 避免重复）
-            # index_id 会自动递增，不需要手动指定
-            for article in articles:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO history_news 
-                    (id, url, title, content, summary, source, publish_time, crawled_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    article.get('id', ''),
-                    article.get('url', ''),
-                    article.get('title', ''),
-                    article.get('content', ''),
-                    article.get('summary', ''),
-                    article.get('source', ''),
-                    str(article.get('publish_time', '')),
-                    str(article.get('crawled_at', ''))
-                ))
-            
-            conn.commit()
-            conn.close()
+            conn = self._connect(db_path)
+            try:
+                self._insert_articles(conn, articles)
+            finally:
+                conn.close()
             return True
         except Exception as e:
             print(f"   ⚠️ 保存数据库失败: {e}")
             return False
 
+    def _insert_articles(self, conn, articles):
+        """在已打开的连接上用一个事务 executemany 写入文章，失败时回滚并抛出"""
+        rows = [
+            (
+                article.get('id', ''),
+                article.get('url', ''),
+                article.get('title', ''),
+                article.get('content', ''),
+                article.get('summary', ''),
+                article.get('source', ''),
+                str(article.get('publish_time', '')),
+                str(article.get('crawled_at', ''))
+            )
+            for article in articles
+        ]
+        conn.execute('BEGIN')
+        try:
+            conn.executemany('''
+                INSERT OR IGNORE INTO history_news 
+                (id, url, title, content, summary, source, publish_time, crawled_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def crawl_article(self, url, site_name):
+        """抓取并解析单篇文章（在线程池中执行）；每篇只下载一次，正文与元数据共用同一份 HTML"""
+        html = self._fetch_html(url)
+        if html is None:
+            return None
+        
+        content, soup, metadata = self.extract_article_content(html)
+        if not content:
+            return None
+        
+        # 提取元数据（标题、发布时间）
+        title, publish_time = self.extract_article_metadata(url, content, html, soup, metadata)
+        
+        # 生成唯一 ID（基于 URL 的 hash）
+        article_id = _article_id(url)
+        
+        # 智能截断摘要（300字左右，在句号处截断）
+        summary = self.smart_truncate_summary(content, target_length=300)
+        
+        return {
+            "id": article_id,
+            "url": url,
+            "title": title,
+            "content": content,  # 完整内容
+            "summary": summary,  # 智能截断的摘要
+            "source": site_name,
+            "publish_time": str(publish_time) if publish_time else "",  # 转换为字符串
+            "crawled_at": str(datetime.now())  # 转换为字符串
+        }
+
     def mine_history(self, site_name="CoinTelegraph", months_back=12, max_articles=None, db_path=None):
         """
         挖掘历史新闻（支持中断恢复，使用SQLite数据库）
@@ -616,10 +1048,11 @@ class HistoryNewsMiner:
         :param months_back: 回溯多少个月
         :param max_articles: 最大文章数量（None 表示不限制）
         :param db_path: 数据库文件路径（用于中断恢复）
+        :return: 数据库中的文章总数（不再把整表读成 DataFrame，需要时用 load_history / export_history_csv）
         """
         if site_name not in self.sites:
             print(f"❌ 未知站点: {site_name}")
-            return pd.DataFrame()
+            return 0
         
         site_config = self.sites[site_name]
         main_sitemap = site_config["sitemap"]
@@ -640,11 +1073,10 @@ class HistoryNewsMiner:
         self.init_database(db_path)
         
         # 加载检查点（如果存在）
-        processed_urls, existing_articles = self.load_checkpoint(db_path)
-        articles = existing_articles.copy()
+        saved_count = self.load_checkpoint(db_path)
         
-        if processed_urls:
-            print(f"   ✅ 从检查点恢复: 已处理 {len(processed_urls)} 条，将继续处理剩余URL")
+        if saved_count:
+            print(f"   ✅ 从检查点恢复: 已处理 {saved_count} 条，将继续处理剩余URL")
         
         # 1. 获取月度 sitemap 列表
         monthly_sitemaps = self.extract_monthly_sitemaps(main_sitemap)
@@ -653,107 +1085,116 @@ class HistoryNewsMiner:
         if len(monthly_sitemaps) > months_back:
             monthly_sitemaps = monthly_sitemaps[:months_back]
         
-        # 2. 从每个月度 sitemap 提取文章链接
+        # 2. 从每个月度 sitemap 提取文章链接（并发下载，按原顺序汇总）
         all_news_urls = []
-        for sitemap_url in monthly_sitemaps:
-            print(f"\n   📂 处理: {sitemap_url}")
-            urls = self.fetch_sitemap(sitemap_url)
-            filtered = self.filter_news_urls(urls)
-            all_news_urls.extend(filtered)
-            print(f"   ✅ 提取到 {len(filtered)} 条相关新闻链接")
-            
-            # 如果设置了限制，检查是否达到
-            if max_articles and len(all_news_urls) >= max_articles:
-                all_news_urls = all_news_urls[:max_articles]
-                print(f"   ⚠️ 达到最大数量限制，停止收集链接")
-                break
+        with ThreadPoolExecutor(max_workers=SITEMAP_WORKERS) as pool:
+            for sitemap_url, urls in zip(monthly_sitemaps, pool.map(self.fetch_sitemap, monthly_sitemaps)):
+                print(f"\n   📂 处理: {sitemap_url}")
+                filtered = self.filter_news_urls(urls)
+                all_news_urls.extend(filtered)
+                print(f"   ✅ 提取到 {len(filtered)} 条相关新闻链接")
+                
+                # 如果设置了限制，检查是否达到
+                if max_articles and len(all_news_urls) >= max_articles:
+                    all_news_urls = all_news_urls[:max_articles]
+                    print(f"   ⚠️ 达到最大数量限制，停止收集链接")
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    break
         
         # 过滤掉已处理的URL
-        remaining_urls = [url for url in all_news_urls if url not in processed_urls]
+        saved_urls = self.find_saved_urls(db_path, all_news_urls)
+        remaining_urls = [url for url in all_news_urls if url not in saved_urls]
         print(f"\n📊 共找到 {len(all_news_urls)} 条相关新闻链接")
-        print(f"📊 已处理 {len(processed_urls)} 条，剩余 {len(remaining_urls)} 条待处理")
+        print(f"📊 已处理 {saved_count} 条，剩余 {len(remaining_urls)} 条待处理")
         
         if not remaining_urls:
             print("✅ 所有URL已处理完成！")
-            return pd.DataFrame(articles)
+            return self.count_history(db_path)
         
         # 3. 爬取文章内容
-        start_idx = len(processed_urls) + 1
+        start_idx = saved_count + 1
         new_articles_count = 0  # 记录新增文章数量
         
-        for idx, url in enumerate(remaining_urls, start=start_idx):
-            print(f"   [{idx}/{len(all_news_urls)}] 爬取: {url[:80]}...")
-            
-            try:
-                content = self.extract_article_content(url)
-                if content:
-                    # 提取元数据（标题、发布时间）
-                    title, publish_time = self.extract_article_metadata(url, content)
-                    
-                    # 生成唯一 ID（基于 URL 的 hash）
-                    article_id = hashlib.md5(url.encode()).hexdigest()[:16]
-                    
-                    # 智能截断摘要（300字左右，在句号处截断）
-                    summary = self.smart_truncate_summary(content, target_length=300)
-                    
-                    new_article = {
-                        "id": article_id,
-                        "url": url,
-                        "title": title,
-                        "content": content,  # 完整内容
-                        "summary": summary,  # 智能截断的摘要
-                        "source": site_name,
-                        "publish_time": str(publish_time) if publish_time else "",  # 转换为字符串
-                        "crawled_at": str(datetime.now())  # 转换为字符串
-                    }
-                    
-                    articles.append(new_article)
-                    processed_urls.add(url)
-                    new_articles_count += 1
-                    
-                    print(f"      ✅ 成功提取: {title[:50]}...")
-                    
-                    # 每5条保存一次检查点（只保存新增的文章）
-                    if new_articles_count % 5 == 0:
-                        # 只保存新增的文章，避免重复保存
-                        new_articles = articles[len(existing_articles):]
-                        if self.save_checkpoint(new_articles, db_path):
-                            print(f"      💾 已保存检查点（共 {len(articles)} 条，新增 {new_articles_count} 条）")
-                else:
+        # 文章并发抓取；解析结果回到主线程，交给后台写线程批量写数据库（SQLite 单写者）
+        writer = CheckpointWriter(self, db_path)
+        pool = ThreadPoolExecutor(max_workers=ARTICLE_WORKERS)
+        futures = {pool.submit(self.crawl_article, url, site_name): url for url in remaining_urls}
+        try:
+            for idx, future in enumerate(as_completed(futures), start=start_idx):
+                url = futures[future]
+                print(f"   [{idx}/{len(all_news_urls)}] 爬取: {url[:80]}...")
+                
+                try:
+                    new_article = future.result()
+                except Exception as e:
+                    print(f"      ❌ 提取失败: {e}")
+                    continue
+                
+                if not new_article:
                     print(f"      ⚠️ 无法提取内容")
-            except KeyboardInterrupt:
-                print(f"\n⚠️ 用户中断，保存当前进度...")
-                new_articles = articles[len(existing_articles):]
-                if self.save_checkpoint(new_articles, db_path):
-                    print(f"💾 已保存 {len(articles)} 条数据到 {db_path}")
-                    print(f"🔄 下次运行将从第 {len(articles) + 1} 条继续")
-                raise
-            except Exception as e:
-                print(f"      ❌ 提取失败: {e}")
-            
-            # 避免请求过快（根据索引调整延迟，避免被封）
-            # 每10条请求后增加延迟
-            if idx % 10 == 0:
-                time.sleep(2)  # 每10条休息2秒
-            elif idx % 5 == 0:
-                time.sleep(1)  # 每5条休息1秒
-            else:
-                time.sleep(0.8)  # 基础延迟0.8秒
+                    continue
+                
+                writer.put(new_article)
+                new_articles_count += 1
+                
+                print(f"      ✅ 成功提取: {new_article['title'][:50]}...")
+        except KeyboardInterrupt:
+            print(f"\n⚠️ 用户中断，保存当前进度...")
+            pool.shutdown(wait=False, cancel_futures=True)
+            if writer.close():
+                print(f"💾 已保存 {saved_count + writer.saved_count} 条数据到 {db_path}")
+                print(f"🔄 下次运行将从第 {saved_count + writer.saved_count + 1} 条继续")
+            raise
+        finally:
+            pool.shutdown(wait=True)
         
-        # 最终保存（只保存新增的文章）
-        new_articles = articles[len(existing_articles):]
-        if new_articles and self.save_checkpoint(new_articles, db_path):
-            print(f"\n💾 最终保存: {len(articles)} 条数据（新增 {len(new_articles)} 条）")
+        # 最终保存（写线程写完队列中剩余的文章）
+        if writer.close():
+            print(f"\n💾 最终保存: {saved_count + writer.saved_count} 条数据（新增 {writer.saved_count} 条）")
         
-        print(f"\n✅ 成功爬取 {len(articles)} 篇文章")
+        print(f"\n✅ 成功爬取 {new_articles_count} 篇新文章")
         
-        # 从数据库读取所有数据返回DataFrame（包含 index_id）
-        conn = sqlite3.connect(db_path)
+        return self.count_history(db_path)
+
+    def load_history(self, db_path):
+        """从数据库读取所有数据返回DataFrame（包含 index_id）"""
+        conn = self._connect(db_path)
         df = pd.read_sql_query('SELECT * FROM history_news ORDER BY publish_time DESC', conn)
         conn.close()
         
         return df
 
+    def count_history(self, db_path):
+        """数据库中的文章总数"""
+        conn = self._connect(db_path)
+        try:
+            return conn.execute('SELECT COUNT(*) FROM history_news').fetchone()[0]
+        finally:
+            conn.close()
+
+    def export_history_csv(self, db_path, csv_path, chunk_size=10000):
+        """
+        按 publish_time 倒序把整表流式导出为 CSV（表头与编码同 DataFrame.to_csv(index=False, encoding='utf-8-sig')）
+        每次只取 chunk_size 行，内存占用与表大小无关
+        :return: 导出的行数
+        """
+        conn = self._connect(db_path)
+        try:
+            cursor = conn.execute('SELECT * FROM history_news ORDER BY publish_time DESC')
+            exported = 0
+            with open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f)
+                writer.writerow([col[0] for col in cursor.description])
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    writer.writerows(rows)
+                    exported += len(rows)
+            return exported
+        finally:
+            conn.close()
+
     def mine_recent_sitemap(self, site_name="CoinTelegraph", days_back=30):
         """
         快速挖掘最近 N 天的新闻（用于每日更新）
@@ -772,39 +1213,27 @@ class HistoryNewsMiner:
         recent_sitemaps = monthly_sitemaps[:2]  # 最近2个月
         
         all_news_urls = []
-        for sitemap_url in recent_sitemaps:
-            urls = self.fetch_sitemap(sitemap_url)
-            filtered = self.filter_news_urls(urls)
-            all_news_urls.extend(filtered)
+        with ThreadPoolExecutor(max_workers=SITEMAP_WORKERS) as pool:
+            for urls in pool.map(self.fetch_sitemap, recent_sitemaps):
+                all_news_urls.extend(self.filter_news_urls(urls))
         
         print(f"📊 找到 {len(all_news_urls)} 条相关新闻链接")
         
-        # 只爬取前50条（快速模式）
+        # 只爬取前50条（快速模式），与 mine_history 相同用线程池并发抓取；
+        # 并发上限由 ARTICLE_WORKERS 控制，请求速率由令牌桶限制，429 由 Session 的重试策略按 Retry-After 退避，不再逐篇固定休眠
+        target_urls = all_news_urls[:50]
         articles = []
         
-        for idx, url in enumerate(all_news_urls[:50], 1):
-            print(f"   [{idx}/50] 爬取: {url[:60]}...")
-            try:
-                content = self.extract_article_content(url)
-                if content:
-                    title, publish_time = self.extract_article_metadata(url, content)
-                    article_id = hashlib.md5(url.encode()).hexdigest()[:16]
-                    summary = self.smart_truncate_summary(content, target_length=300)
-                    
-                    articles.append({
-                        "id": article_id,
-                        "url": url,
-                        "title": title,
-                        "content": content,
-                        "summary": summary,
-                        "source": site_name,
-                        "publish_time": publish_time,
-                        "crawled_at": datetime.now()
-                    })
-            except Exception as e:
-                print(f"      ⚠️ 提取失败: {e}")
-            
-            time.sleep(0.8)  # 基础延迟
+        with ThreadPoolExecutor(max_workers=ARTICLE_WORKERS) as pool:
+            futures = [pool.submit(self.crawl_article, url, site_name) for url in target_urls]
+            for idx, (url, future) in enumerate(zip(target_urls, futures), 1):
+                print(f"   [{idx}/{len(target_urls)}] 爬取: {url[:60]}...")
+                try:
+                    article = future.result()
+                    if article:
+                        articles.append(article)
+                except Exception as e:
+                    print(f"      ⚠️ 提取失败: {e}")
         
         return pd.DataFrame(articles)
 
@@ -824,33 +1253,44 @@ if __name__ == "__main__":
     
     miner = HistoryNewsMiner()
     
+    csv_backup = f"history_news_backup_{datetime.now().strftime('%Y%m%d')}.csv"
+    
     if args.mode == 'full':
         print("🚀 冷启动模式：挖掘完整历史数据")
         # 统一使用同一个数据库文件，所有数据存在一个表里
         db_path = "history_news.db"
-        df = miner.mine_history(
+        total = miner.mine_history(
             site_name="CoinTelegraph",
             months_back=args.months,
             max_articles=args.max,  # None 表示不限制
             db_path=db_path
         )
+        
+        if total:
+            # 数据已经在数据库中保存了，这里只是确认
+            print(f"\n✅ 数据挖掘完成！")
+            print(f"📊 共 {total} 条历史新闻")
+            print(f"💾 数据已保存在数据库中")
+            
+            # 可选：导出为CSV备份（从数据库分块流式导出，不把整表读入内存）
+            miner.export_history_csv(db_path, csv_backup)
+            print(f"📄 CSV备份已保存到: {csv_backup}")
+        else:
+            print("⚠️ 未获取到数据")
     else:
         print("🚀 快速模式：挖掘最近30天数据")
         df = miner.mine_recent_sitemap(
             site_name="CoinTelegraph",
             days_back=30
         )
-    
-    if not df.empty:
-        # 数据已经在数据库中保存了，这里只是确认
-        print(f"\n✅ 数据挖掘完成！")
-        print(f"📊 共 {len(df)} 条历史新闻")
-        print(f"💾 数据已保存在数据库中")
-        
-        # 可选：导出为CSV备份
-        csv_backup = f"history_news_backup_{datetime.now().strftime('%Y%m%d')}.csv"
-        df.to_csv(csv_backup, index=False, encoding='utf-8-sig')
-        print(f"📄 CSV备份已保存到: {csv_backup}")
-    else:
-        print("⚠️ 未获取到数据")
+        
+        if not df.empty:
+            print(f"\n✅ 数据挖掘完成！")
+            print(f"📊 共 {len(df)} 条历史新闻")
+            
+            # 可选：导出为CSV备份
+            df.to_csv(csv_backup, index=False, encoding='utf-8-sig')
+            print(f"📄 CSV备份已保存到: {csv_backup}")
+        else:
+            print("⚠️ 未获取到数据")
 
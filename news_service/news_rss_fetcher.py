@@ -4,13 +4,22 @@ RSS 新闻抓取与清洗模块
 """
 import feedparser
 import pandas as pd
-from bs4 import BeautifulSoup
 from datetime import datetime
 import re
+import html
 import time
 import os
 import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 # 设置 Windows 控制台编码为 UTF-8
 if sys.platform == 'win32':
@@ -18,6 +27,13 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+# 关键词匹配前把空白与连字符统一成单个空格
+SEPARATOR_RE = re.compile(r'[\s\-]+')
+
+# RSS 摘要中的 HTML：注释、script/style 整块、普通标签
+HTML_TAG_RE = re.compile(r'<!--.*?-->|<(script|style)\b.*?</\1\s*>|<[^>]+>', re.DOTALL | re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
 
 class CryptoNewsFetcher:
     def __init__(self):
@@ -62,26 +78,13 @@ class CryptoNewsFetcher:
             "Altcoin Watch", "NFT", "Metaverse", "Analysis",
             "Price Prediction", "Market Wrap", "Daily Digest"
         ]
-
-
-    def clean_html(self, raw_html):
-        """去除 RSS 里的 HTML 标签 (<p>, <a> 等)"""
-        if not raw_html:
-            return ""
-        soup = BeautifulSoup(raw_html, "html.parser")
-        return soup.get_text().strip()
-
-    def filter_for_pentosh1_strict(self, title, content, entry_tags=None):
-        """
-        针对 CoinDesk/CoinTelegraph 的严格过滤器
-        目标：只保留硬核事实，剔除分析师瞎猜
-        返回: (是否保留, 标签)
-        """
-        text = (title + " " + content).lower()
+        self._banned_tags_lower = [banned.lower() for banned in self.banned_tags]
         
-        # 1. 垃圾关键词 (黑名单升级版)
+        
+        # ===== Pentosh1 严格过滤器的关键词（只构建一次，匹配器在下面预编译）=====
+        # 垃圾关键词 (黑名单升级版)
         # CT/CD 经常发 "Price Analysis", "Top 5 coins", "Why Bitcoin price is down"
-        noise_keywords = [
+        self.noise_keywords = [
             "price analysis", "price prediction", "top 5", "top 3", "could hit", 
             "opinion", "market wrap", "daily digest", "podcast", "video",
             "why", "what to expect", "bull run coming?", "analyst says",
@@ -93,41 +96,15 @@ class CryptoNewsFetcher:
             "chance of hitting", "depends on investors", "market's response"
         ]
         
-        # 检查标题是否包含问号（通常是分析类文章）
-        if "?" in title:
-            # 但允许一些例外，比如 "Will SEC approve?" 这种硬新闻
-            if not any(kw in text for kw in ["sec", "approve", "lawsuit", "ban", "jail"]):
-                return False, "Analysis_Question"
-        
-        # 检查明显的分析类标题模式
-        analysis_patterns = [
+        # 明显的分析类标题模式
+        self.analysis_patterns = [
             "charts point", "point to", "direction of", "next move", "next big move",
             "risks return", "risks", "trader says", "makes sense", "price target"
         ]
-        for pattern in analysis_patterns:
-            if pattern in title.lower():
-                # 但允许一些例外，比如监管相关的硬新闻
-                if not any(kw in text for kw in ["sec", "approve", "lawsuit", "ban", "jail", "regulation"]):
-                    return False, "Analysis_Pattern"
-        
-        for noise in noise_keywords:
-            if noise in text:
-                return False, "Opinion/Noise"
-        
-        # 2. 基于 RSS 标签的过滤（如果可用）
-        if entry_tags:
-            # 先检查是不是垃圾分类
-            for tag in entry_tags:
-                tag_lower = tag.lower()
-                for banned in self.banned_tags:
-                    if banned.lower() in tag_lower:
-                        return False, "Banned_Tag"
-        
-        # 3. Pentosh1 核心关注 (白名单)
-        # 只保留4大类核心关键词（使用正则表达式匹配，确保单词边界）
         
+        # Pentosh1 核心关注 (白名单)：4大类核心关键词
         # 1. 宏观/财政 (Macro/Fiscal) - 决定"水位"
-        macro_keywords = [
+        self.macro_keywords = [
             # 核心央行与人物
             "fed", "federal reserve", "fomc", "jerome powell", "powell", "chair powell",
             "yellen", "janet yellen", "lagarde", "ecb", "european central bank",
@@ -164,7 +141,7 @@ class CryptoNewsFetcher:
         ]
         
         # 2. 机构/资金 (Smart Money) - 决定"风向"
-        institutional_keywords = [
+        self.institutional_keywords = [
             # ETF 与信托产品
             "etf", "spot etf", "bitcoin etf", "ethereum etf", "crypto etf", "etp", "etn",
             "gbtc", "ethe", "ibit", "fbtc", "arkb", "bitb", "trust", "nav discount",
@@ -200,7 +177,7 @@ class CryptoNewsFetcher:
         ]
         
         # 3. 监管 (Regulation) - 最大的黑天鹅
-        regulation_keywords = [
+        self.regulation_keywords = [
             # 美国监管机构
             "sec", "securities and exchange commission", "gary gensler", "gensler", "hester peirce",
             "cftc", "commodity futures trading commission", "rostin behnam",
@@ -234,7 +211,7 @@ class CryptoNewsFetcher:
         ]
         
         # 4. 风险事件 (Risk Events) - 用于风控
-        risk_keywords = [
+        self.risk_keywords = [
             # 黑客与攻击
             "hack", "hacked", "hacker", "exploit", "exploited", "vulnerability", "bug",
             "attack", "attacker", "breach", "security breach", "compromised",
@@ -267,47 +244,241 @@ class CryptoNewsFetcher:
         ]
         
         # 按类别组织关键词
-        high_value_keywords = {
-            "Macro": macro_keywords,
-            "Institutional": institutional_keywords,
-            "Regulation": regulation_keywords,
-            "Risk": risk_keywords
+        self.high_value_keywords = {
+            "Macro": self.macro_keywords,
+            "Institutional": self.institutional_keywords,
+            "Regulation": self.regulation_keywords,
+            "Risk": self.risk_keywords
         }
         
-        # 使用正则表达式匹配（带单词边界）
-        for tag, keywords in high_value_keywords.items():
-            for kw in keywords:
-                # 构建正则表达式模式
-                escaped_kw = re.escape(kw.lower())
-                if ' ' in kw or '-' in kw:
-                    # 多词关键词：允许空格、连字符和标点
-                    pattern = escaped_kw.replace(r'\ ', r'[\s\-]+').replace(r'\-', r'[\s\-]+')
-                else:
-                    # 单词边界匹配
-                    pattern = r'\b' + escaped_kw + r'\b'
-                
-                if re.search(pattern, text, re.IGNORECASE):
-                    return True, tag
+        # 黑名单与分析模式都是子串匹配：各自合并成一个正则，一次扫描
+        self._noise_regex = re.compile('|'.join(re.escape(kw) for kw in self.noise_keywords))
+        self._analysis_regex = re.compile('|'.join(re.escape(kw) for kw in self.analysis_patterns))
+        # 白名单：有 pyahocorasick 时所有类别合并进一个自动机单次扫描，否则每个类别一个组合正则
+        self._keyword_automaton = self._build_keyword_automaton(self.high_value_keywords) if AHOCORASICK_AVAILABLE else None
+        self._category_regexes = None if self._keyword_automaton is not None else self._build_category_regexes(self.high_value_keywords)
+        
+        # 所有 RSS 源共享一个 Session，复用 keep-alive 连接（同域名的多个分类源不再重复握手）
+        # Accept-Encoding 沿用 requests 默认值：gzip/deflate，安装了 brotli 时自动包含 br 并透明解压
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8'
+        })
+        # 5xx/429 短暂失败时退避重试一次，而不是直接切到备用 URL 或放弃该源
+        retry = Retry(
+            total=2,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=len(self.feeds), pool_maxsize=len(self.feeds), max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+
+    def clean_html(self, raw_html):
+        """
+        去除 RSS 里的 HTML 标签 (<p>, <a> 等)
+        摘要只用于关键词匹配和截取，不需要解析树：正则去标签（替换为空格，避免相邻段落粘连），再反转义实体、合并空白
+        """
+        if not raw_html:
+            return ""
+        if '<' not in raw_html and '&' not in raw_html:
+            # 纯文本摘要：无需去标签和反转义
+            return WHITESPACE_RE.sub(' ', raw_html).strip()
+        text = html.unescape(HTML_TAG_RE.sub(' ', raw_html))
+        return WHITESPACE_RE.sub(' ', text).strip()
+
+    def filter_for_pentosh1_strict(self, title, content, entry_tags=None):
+        """
+        针对 CoinDesk/CoinTelegraph 的严格过滤器
+        目标：只保留硬核事实，剔除分析师瞎猜
+        返回: (是否保留, 标签)
+        """
+        # 只看标题/标签就能决定的剔除放在最前面，命中时不必再小写和扫描正文
+        # （各剔除条件都返回 False，先后顺序只影响剔除原因，不影响是否保留）
+        title_lower = title.lower()
+        # 标签只小写一次，黑名单与白名单检查共用
+        tags_lower = [tag.lower() for tag in entry_tags] if entry_tags else []
+        
+        # 基于 RSS 标签的过滤（如果可用）：先检查是不是垃圾分类
+        for tag_lower in tags_lower:
+            for banned in self._banned_tags_lower:
+                if banned in tag_lower:
+                    return False, "Banned_Tag"
+        
+        # 垃圾关键词出现在标题里时必然也出现在标题+正文里
+        if self._noise_regex.search(title_lower):
+            return False, "Opinion/Noise"
+        
+        text = title_lower + " " + content.lower()
+        
+        # 1. 垃圾关键词 (黑名单升级版)
+        # 检查标题是否包含问号（通常是分析类文章）
+        if "?" in title:
+            # 但允许一些例外，比如 "Will SEC approve?" 这种硬新闻
+            if not any(kw in text for kw in ["sec", "approve", "lawsuit", "ban", "jail"]):
+                return False, "Analysis_Question"
+        
+        # 检查明显的分析类标题模式
+        if self._analysis_regex.search(title_lower):
+            # 但允许一些例外，比如监管相关的硬新闻
+            if not any(kw in text for kw in ["sec", "approve", "lawsuit", "ban", "jail", "regulation"]):
+                return False, "Analysis_Pattern"
+        
+        if self._noise_regex.search(text):
+            return False, "Opinion/Noise"
+        
+        # 3. Pentosh1 核心关注 (白名单)：按 Macro → Institutional → Regulation → Risk 的优先级返回命中类别
+        tag = self._match_high_value(text)
+        if tag:
+            return True, tag
         
         # 4. 基于 RSS 标签的白名单检查（如果可用）
         # 注意：标签检查只是辅助，主要依赖关键词匹配
         # 如果标签匹配到关键词类别，返回对应分类
-        if entry_tags:
-            for tag in entry_tags:
-                tag_lower = tag.lower()
-                # 检查标签是否包含关键词
-                if any(kw in tag_lower for kw in ["regulation", "policy", "legal", "sec", "lawsuit"]):
-                    return True, "Regulation"
-                elif any(kw in tag_lower for kw in ["business", "institution", "etf", "funding"]):
-                    return True, "Institutional"
-                elif any(kw in tag_lower for kw in ["macro", "fed", "inflation", "rate"]):
-                    return True, "Macro"
-                elif any(kw in tag_lower for kw in ["hack", "exploit", "bankrupt", "halt"]):
-                    return True, "Risk"
+        for tag_lower in tags_lower:
+            # 检查标签是否包含关键词
+            if any(kw in tag_lower for kw in ["regulation", "policy", "legal", "sec", "lawsuit"]):
+                return True, "Regulation"
+            elif any(kw in tag_lower for kw in ["business", "institution", "etf", "funding"]):
+                return True, "Institutional"
+            elif any(kw in tag_lower for kw in ["macro", "fed", "inflation", "rate"]):
+                return True, "Macro"
+            elif any(kw in tag_lower for kw in ["hack", "exploit", "bankrupt", "halt"]):
+                return True, "Risk"
         
         # 默认丢弃 (只保留匹配到4大类关键词的新闻)
         return False, "Low_Relevance"
 
+    @staticmethod
+    def _normalize_separators(text):
+        """空白与连字符统一为单个空格：多词关键词的 "rate cut" / "rate-cut" 两种写法在这里归一，构建时无需展开"""
+        return SEPARATOR_RE.sub(' ', text)
+
+    @classmethod
+    def _build_keyword_automaton(cls, high_value_keywords):
+        """
+        所有类别的关键词放进一个 Aho-Corasick 自动机
+        值为 (类别序号, 长度, 是否需要单词边界)；单词关键词要求两侧为边界，多词关键词按子串匹配
+        """
+        automaton = ahocorasick.Automaton()
+        for category_idx, keywords in enumerate(high_value_keywords.values()):
+            for kw in keywords:
+                key = cls._normalize_separators(kw.lower())
+                need_boundary = ' ' not in key
+                existing = automaton.get(key, None)
+                # 同一关键词出现在多个类别时保留优先级更高（序号更小）的类别
+                if existing is None or category_idx < existing[0]:
+                    automaton.add_word(key, (category_idx, len(key), need_boundary))
+        automaton.make_automaton()
+        return automaton
+
+    @classmethod
+    def _build_category_regexes(cls, high_value_keywords):
+        """无 pyahocorasick 时的回退：每个类别一个组合正则（单词关键词带 \b，多词关键词按子串）"""
+        regexes = []
+        for keywords in high_value_keywords.values():
+            keys = sorted({cls._normalize_separators(kw.lower()) for kw in keywords}, key=len, reverse=True)
+            singles = [re.escape(k) for k in keys if ' ' not in k]
+            multis = [re.escape(k) for k in keys if ' ' in k]
+            parts = []
+            if singles:
+                parts.append(r'\b(?:' + '|'.join(singles) + r')\b')
+            if multis:
+                parts.append('|'.join(multis))
+            regexes.append(re.compile('|'.join(parts)))
+        return regexes
+
+    def _match_high_value(self, text):
+        """返回命中的最高优先级类别名，未命中返回 None"""
+        text = self._normalize_separators(text)
+        categories = list(self.high_value_keywords)
+        
+        if self._keyword_automaton is None:
+            for category, regex in zip(categories, self._category_regexes):
+                if regex.search(text):
+                    return category
+            return None
+        
+        best = None
+        last = len(text) - 1
+        for end, (category_idx, length, need_boundary) in self._keyword_automaton.iter(text):
+            if best is not None and category_idx >= best:
+                continue
+            if need_boundary:
+                start = end - length + 1
+                if start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+                    continue
+                if end < last and (text[end + 1].isalnum() or text[end + 1] == '_'):
+                    continue
+            best = category_idx
+            if best == 0:
+                break
+        return categories[best] if best is not None else None
+
+    def _fetch_one_feed(self, source):
+        """
+        下载并解析单个 RSS 源（在线程池中执行），按顺序尝试备用 URL
+        :return: (源名称, feed)，所有 URL 都失败时 feed 为 None
+        """
+        source_name, urls = source
+        # 支持多个备用 URL
+        if isinstance(urls, str):
+            urls = [urls]
+        
+        feed = None
+        last_error = None
+        
+        for url in urls:
+            try:
+                print(f"   ... 正在连接 {source_name}: {url}")
+                # 使用共享 Session 获取内容（已设置 User-Agent）
+                response = self.session.get(url, timeout=10)
+                
+                # 调试：检查响应内容
+                if response.status_code != 200:
+                    print(f"   ⚠️ HTTP 状态码: {response.status_code}")
+                    continue
+                
+                # 检查内容类型
+                content_type = response.headers.get('Content-Type', '')
+                if 'xml' not in content_type.lower() and 'rss' not in content_type.lower() and 'atom' not in content_type.lower():
+                    print(f"   ⚠️ 内容类型可能不正确: {content_type}")
+                
+                # 使用 feedparser 解析内容（传原始字节，由 feedparser 按 XML 声明识别编码）
+                # 摘要随后由 clean_html 去标签，只用于关键词匹配：关闭 HTML 清洗和相对链接解析
+                feed = feedparser.parse(response.content, sanitize_html=False, resolve_relative_uris=False)
+
+                # 即使有警告，也尝试读取条目（有些 RSS 源格式不完美但仍可用）
+                if feed.bozo and len(feed.entries) == 0:
+                    error_msg = ""
+                    if hasattr(feed, 'bozo_exception'):
+                        error_msg = f" ({feed.bozo_exception})"
+                    print(f"   ⚠️ {source_name} RSS 解析失败{error_msg}，尝试下一个源...")
+                    last_error = feed.bozo_exception if hasattr(feed, 'bozo_exception') else "解析错误"
+                    continue
+                
+                # 如果成功获取到条目，即使有警告也使用
+                if len(feed.entries) > 0:
+                    if feed.bozo:
+                        print(f"   ⚠️ {source_name} RSS 有格式警告，但已获取到 {len(feed.entries)} 条新闻")
+                    break
+                else:
+                    print(f"   ⚠️ {source_name} 未获取到新闻条目，尝试下一个源...")
+                    continue
+                
+            except Exception as e:
+                print(f"   ⚠️ {source_name} 连接失败 ({url}): {e}")
+                last_error = str(e)
+                continue
+        
+        if feed is None or len(feed.entries) == 0:
+            return source_name, None
+        return source_name, feed
+
     def fetch_all(self, limit=None):
         """
         抓取所有新闻源的最新新闻（使用严格过滤器，只保留硬新闻）
@@ -316,62 +487,13 @@ class CryptoNewsFetcher:
         all_news = []
         print(f"📡 开始抓取 RSS 源: {datetime.now()}")
 
-        for source_name, urls in self.feeds.items():
-            # 支持多个备用 URL
-            if isinstance(urls, str):
-                urls = [urls]
-            
-            feed = None
-            last_error = None
-            
-            for url in urls:
-                try:
-                    print(f"   ... 正在连接 {source_name}: {url}")
-                    # 使用 requests 获取内容，设置 User-Agent
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                    }
-                    response = requests.get(url, headers=headers, timeout=10)
-                    response.encoding = response.apparent_encoding or 'utf-8'
-                    
-                    # 调试：检查响应内容
-                    if response.status_code != 200:
-                        print(f"   ⚠️ HTTP 状态码: {response.status_code}")
-                        continue
-                    
-                    # 检查内容类型
-                    content_type = response.headers.get('Content-Type', '')
-                    if 'xml' not in content_type.lower() and 'rss' not in content_type.lower() and 'atom' not in content_type.lower():
-                        print(f"   ⚠️ 内容类型可能不正确: {content_type}")
-                    
-                    # 使用 feedparser 解析内容
-                    feed = feedparser.parse(response.content)
-
-                    # 即使有警告，也尝试读取条目（有些 RSS 源格式不完美但仍可用）
-                    if feed.bozo and len(feed.entries) == 0:
-                        error_msg = ""
-                        if hasattr(feed, 'bozo_exception'):
-                            error_msg = f" ({feed.bozo_exception})"
-                        print(f"   ⚠️ {source_name} RSS 解析失败{error_msg}，尝试下一个源...")
-                        last_error = feed.bozo_exception if hasattr(feed, 'bozo_exception') else "解析错误"
-                        continue
-                    
-                    # 如果成功获取到条目，即使有警告也使用
-                    if len(feed.entries) > 0:
-                        if feed.bozo:
-                            print(f"   ⚠️ {source_name} RSS 有格式警告，但已获取到 {len(feed.entries)} 条新闻")
-                        break
-                    else:
-                        print(f"   ⚠️ {source_name} 未获取到新闻条目，尝试下一个源...")
-                        continue
-                    
-                except Exception as e:
-                    print(f"   ⚠️ {source_name} 连接失败 ({url}): {e}")
-                    last_error = str(e)
-                    continue
-
+        # 各 RSS 源互不依赖，并发下载，总耗时约等于最慢的一个源；解析后的条目按源的顺序依次处理
+        with ThreadPoolExecutor(max_workers=len(self.feeds)) as executor:
+            fetched = list(executor.map(self._fetch_one_feed, self.feeds.items()))
+        
+        for source_name, feed in fetched:
             # 如果所有源都失败了
-            if feed is None or len(feed.entries) == 0:
+            if feed is None:
                 print(f"   ❌ {source_name} 所有源均失败，跳过")
                 continue
 
@@ -444,63 +566,31 @@ class CryptoNewsFetcher:
     def _deduplicate_news(self, df):
         """
         去重：相同时间+标题只保留一条，合并所有tag和source
+        按 (time, title) 一次 groupby 聚合，不再逐行 iterrows
         """
         if df.empty:
             return df
         
-        # 创建唯一标识：时间 + 标题
-        df['time_str'] = df['time'].astype(str)
-        df['unique_key'] = df['time_str'] + '|||' + df['title']
-        
-        # 用于存储去重后的数据
-        deduplicated_rows = []
-        seen_keys = {}
-        
-        for idx, row in df.iterrows():
-            key = row['unique_key']
-            
-            if key not in seen_keys:
-                # 第一次遇到这条新闻，直接添加
-                seen_keys[key] = len(deduplicated_rows)
-                deduplicated_rows.append({
-                    "source": row['source'],
-                    "time": row['time'],
-                    "tag": row['tag'],
-                    "title": row['title'],
-                    "content_summary": row['content_summary'],
-                    "url": row['url'],
-                    "rss_tags": row['rss_tags']
-                })
-            else:
-                # 重复新闻，合并tag、source和rss_tags
-                existing_idx = seen_keys[key]
-                existing = deduplicated_rows[existing_idx]
-                
-                # 合并source（用逗号分隔，去重）
-                existing_sources = set(existing['source'].split(", "))
-                new_sources = set([row['source']])
-                merged_sources = existing_sources | new_sources
-                existing['source'] = ", ".join(sorted(merged_sources))
-                
-                # 合并tag（用逗号分隔，去重）
-                existing_tags = set(existing['tag'].split(", "))
-                new_tags = set([row['tag']])
-                merged_tags = existing_tags | new_tags
-                existing['tag'] = ", ".join(sorted(merged_tags))
-                
-                # 合并rss_tags（去重后合并）
-                existing_rss_tags = set(existing['rss_tags'].split(", ") if existing['rss_tags'] else [])
-                new_rss_tags = set(row['rss_tags'].split(", ") if row['rss_tags'] else [])
-                merged_rss_tags = existing_rss_tags | new_rss_tags
-                existing['rss_tags'] = ", ".join(sorted([t for t in merged_rss_tags if t]))  # 过滤空字符串
-        
-        # 转换回DataFrame并删除辅助列
-        result_df = pd.DataFrame(deduplicated_rows)
-        if not result_df.empty:
-            result_df = result_df.sort_values(by="time", ascending=False)
+        result_df = df.groupby(['time', 'title'], sort=False, as_index=False).agg(
+            source=('source', self._merge_labels),
+            tag=('tag', self._merge_labels),
+            content_summary=('content_summary', 'first'),
+            url=('url', 'first'),
+            rss_tags=('rss_tags', self._merge_labels),
+        )
+        result_df = result_df[["source", "time", "tag", "title", "content_summary", "url", "rss_tags"]]
+        result_df = result_df.sort_values(by="time", ascending=False)
         
         return result_df
 
+    @staticmethod
+    def _merge_labels(values):
+        """合并重复新闻的 source / tag / rss_tags：拆开逗号分隔的值，去重、去空后排序拼接；只有一条时原样保留"""
+        if len(values) == 1:
+            return values.iloc[0]
+        merged = {part for value in values if value for part in value.split(", ")}
+        return ", ".join(sorted(part for part in merged if part))
+
 
 if __name__ == "__main__":
     fetcher = CryptoNewsFetcher()
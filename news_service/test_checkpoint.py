@@ -2,7 +2,7 @@
 测试检查点功能
 """
 import sys
-import pandas as pd
+import csv
 import os
 
 # 设置 Windows 控制台编码为 UTF-8
@@ -27,15 +27,30 @@ print("🧪 测试检查点功能\n")
 
 # 1. 保存检查点
 print("1️⃣ 保存检查点文件...")
-df = pd.DataFrame(test_data)
-df.to_csv(checkpoint_file, index=False, encoding='utf-8-sig')
+# 只是保存/读回一组 URL，用标准库 csv 即可，无需导入 pandas
+fieldnames = ['id', 'url', 'title']
+# 字段不含逗号/引号/换行时无需转义：拼成一个字符串，经 1 MB 缓冲一次写入
+needs_quoting = any(
+    any(ch in str(row[key]) for ch in ',"\r\n')
+    for row in test_data for key in fieldnames
+)
+with open(checkpoint_file, 'w', encoding='utf-8-sig', newline='', buffering=1 << 20) as f:
+    if needs_quoting:
+        # 与下面手工拼接的分支一致使用 \n 换行，文件格式不随是否需要转义而变化
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(test_data)
+    else:
+        lines = [','.join(fieldnames)]
+        lines += [f"{row['id']},{row['url']},{row['title']}" for row in test_data]
+        f.write('\n'.join(lines) + '\n')
 print(f"   ✅ 已保存 {len(test_data)} 条数据到 {checkpoint_file}")
 
 # 2. 读取检查点
 print("\n2️⃣ 读取检查点文件...")
 if os.path.exists(checkpoint_file):
-    df_loaded = pd.read_csv(checkpoint_file, encoding='utf-8-sig')
-    processed_urls = set(df_loaded['url'].tolist())
+    with open(checkpoint_file, encoding='utf-8-sig', newline='') as f:
+        processed_urls = {row['url'] for row in csv.DictReader(f)}
     print(f"   ✅ 读取成功: {len(processed_urls)} 条URL")
     print(f"   📋 已处理的URL:")
     for url in processed_urls: